@@ -0,0 +1,169 @@
+import hashlib
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from date_parser import AULES_TZ, format_fecha
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Formato más compacto disponible para guardar entregas
+STORAGE_FORMAT = 'json' if msgpack is None else 'msgpack'
+
+HASH_FIELDS = ('nombre', 'fecha_completa', 'curso', 'url')
+DETAIL_FIELDS = ('fecha_limite', 'estado_entrega', 'descripcion')
+# Claves de los diccionarios que se usaban antes del modelo, en el mismo orden
+BASE_KEYS = ('id', 'nombre', 'fecha', 'fecha_entrega', 'hora', 'fecha_completa', 'curso', 'url')
+KEYS = BASE_KEYS + DETAIL_FIELDS
+DATE_FORMATS = ('%d/%m/%Y %H:%M', '%d/%m/%Y')
+
+
+def local_datetime(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    # Las fechas sin zona son horas de pared de Aules, no del equipo que ejecuta el script
+    if value.tzinfo is None:
+        return value.replace(tzinfo=AULES_TZ)
+    return value.astimezone(AULES_TZ)
+
+
+def parse_fecha_completa(text):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _hash_value(value):
+    if isinstance(value, datetime):
+        # Mismo texto que las fechas sin zona de antes, para no invalidar los hashes ya guardados
+        return str(value.replace(tzinfo=None))
+    return str(value or '')
+
+
+@dataclass(frozen=True, slots=True)
+class Assignment:
+    id: str | None
+    nombre: str
+    fecha: datetime | None
+    curso: str | None
+    url: str
+    fecha_limite: datetime | None = None
+    estado_entrega: str | None = None
+    descripcion: str | None = None
+    content_hash: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'fecha', local_datetime(self.fecha))
+        object.__setattr__(self, 'fecha_limite', local_datetime(self.fecha_limite))
+        if self.curso:
+            # Miles de entregas comparten unos pocos nombres de curso
+            object.__setattr__(self, 'curso', sys.intern(self.curso))
+        object.__setattr__(self, 'content_hash', self._compute_hash())
+
+    def _compute_hash(self):
+        raw = '\x1f'.join(_hash_value(getattr(self, name)) for name in HASH_FIELDS)
+        if any(getattr(self, name) for name in DETAIL_FIELDS):
+            raw += '\x1e' + '\x1f'.join(_hash_value(getattr(self, name)) for name in DETAIL_FIELDS)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def __hash__(self):
+        return hash((self.id, self.content_hash))
+
+    @property
+    def fecha_entrega(self):
+        return format_fecha(self.fecha)[0]
+
+    @property
+    def hora(self):
+        return format_fecha(self.fecha)[1]
+
+    @property
+    def fecha_completa(self):
+        return format_fecha(self.fecha)[2]
+
+    # Acceso como diccionario para el código que aún trata las entregas como dict
+    def keys(self):
+        return [*BASE_KEYS, *(name for name in DETAIL_FIELDS if getattr(self, name) is not None)]
+
+    def __contains__(self, key):
+        return key in BASE_KEYS or (key in DETAIL_FIELDS and getattr(self, key) is not None)
+
+    def __getitem__(self, key):
+        if key not in KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self else default
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def to_record(self):
+        record = {
+            'id': self.id,
+            'nombre': self.nombre,
+            'fecha': self.fecha.isoformat() if self.fecha else None,
+            'curso': self.curso,
+            'url': self.url,
+        }
+        if self.fecha_limite:
+            record['fecha_limite'] = self.fecha_limite.isoformat()
+        if self.estado_entrega:
+            record['estado_entrega'] = self.estado_entrega
+        if self.descripcion:
+            record['descripcion'] = self.descripcion
+        return record
+
+    @classmethod
+    def from_dict(cls, data):
+        fecha = data.get('fecha')
+        if fecha is None:
+            fecha = parse_fecha_completa(data.get('fecha_completa'))
+        return cls(
+            id=data.get('id'),
+            nombre=data.get('nombre', ''),
+            fecha=fecha,
+            curso=data.get('curso'),
+            url=data.get('url', ''),
+            fecha_limite=data.get('fecha_limite'),
+            estado_entrega=data.get('estado_entrega'),
+            descripcion=data.get('descripcion'),
+        )
+
+
+def as_assignment(value):
+    return value if isinstance(value, Assignment) else Assignment.from_dict(value)
+
+
+def to_records(assignments):
+    return [as_assignment(assignment).to_record() for assignment in assignments]
+
+
+def from_records(records):
+    return [Assignment.from_dict(record) for record in records]
+
+
+def dumps_assignments(assignments, fmt='json'):
+    records = to_records(assignments)
+    if fmt == 'msgpack':
+        if msgpack is None:
+            raise RuntimeError("Para usar msgpack hay que instalar el paquete msgpack")
+        return msgpack.packb(records)
+    return json.dumps(records, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads_assignments(data, fmt='json'):
+    if fmt == 'msgpack':
+        if msgpack is None:
+            raise RuntimeError("Para usar msgpack hay que instalar el paquete msgpack")
+        return from_records(msgpack.unpackb(data))
+    return from_records(json.loads(data))
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+import time
+from aules_http import AulesSessionExpired, assignment_from_event
+from calendar_batch import CalendarBatchWriter
+from sync_state import assignment_hash, classify_assignment, due_timestamp, removed_assignments
+from metrics import METRICS
+from config import PIPELINE_WRITERS, PIPELINE_QUEUE_SIZE, PIPELINE_WRITE_BATCH
+
+_DONE = object()
+
+log = logging.getLogger(__name__)
+
+
+async def stream_assignments(crawler):
+    # La caché de instantáneas usa sqlite desde este hilo: se consulta y se escribe sin to_thread
+    reused = crawler._reuse_snapshot()
+    if reused is not None:
+        for assignment in reused:
+            yield assignment
+        return
+    if not await asyncio.to_thread(crawler.login):
+        raise AulesSessionExpired("No se pudo iniciar sesión en Aules")
+    if crawler.use_selenium or crawler.include_courses:
+        # El navegador y el recorrido de cursos solo entregan resultados completos
+        for assignment in await asyncio.to_thread(crawler._fetch_assignments):
+            yield assignment
+        return
+    pages = crawler.http_client.iter_timeline_pages()
+    seen = set()
+    received = []
+    streamed = []
+    while True:
+        events = await asyncio.to_thread(next, pages, None)
+        if events is None:
+            break
+        received.extend(events)
+        for event in events:
+            if event.get('modulename') != 'assign':
+                continue
+            assignment = assignment_from_event(event)
+            if assignment.get('id') and assignment['id'] not in seen:
+                seen.add(assignment['id'])
+                streamed.append(assignment)
+                yield assignment
+    METRICS.inc('aules_entregas_analizadas_total', len(seen), origen='ajax')
+    crawler._record_snapshot('ajax', json.dumps(received, ensure_ascii=False), streamed)
+
+
+class AsyncSyncPipeline:
+    def __init__(self, crawler, calendar, state, delete_removed=False, writers=PIPELINE_WRITERS,
+                 queue_size=PIPELINE_QUEUE_SIZE, write_batch=PIPELINE_WRITE_BATCH):
+        self.crawler = crawler
+        self.calendar = calendar
+        self.state = state
+        self.delete_removed = delete_removed
+        self.writers = writers
+        self.queue_size = queue_size
+        self.write_batch = write_batch
+        self.summary = {'creados': 0, 'actualizados': 0, 'eliminados': 0, 'sin_cambios': 0, 'errores': 0}
+        self.unchanged = []
+        self.first_event_latency = None
+        self.last_event_latency = None
+
+    def _operation(self, assignment, known):
+        action, event_id = classify_assignment(assignment, known)
+        if action == 'unchanged':
+            self.summary['sin_cambios'] += 1
+            self.unchanged.append(assignment)
+            return None
+        body = self.calendar.event_body_for(assignment)
+        if not body:
+            return None
+        stored = assignment_hash(assignment), due_timestamp(assignment)
+        if action == 'insert':
+            return 'creados', assignment['id'], None, body, stored
+        return 'actualizados', assignment['id'], event_id, body, stored
+
+    async def _produce(self, queue):
+        known = self.calendar.known_events(self.state)
+        seen = set()
+        with self.crawler.timer.phase('cronologia_lista'):
+            async for assignment in stream_assignments(self.crawler):
+                seen.add(assignment['id'])
+                operation = self._operation(assignment, known)
+                if operation:
+                    await queue.put(operation)
+        self.state.fill_due_dates(self.unchanged)
+        self.state.commit()
+        if self.delete_removed:
+            for assignment_id, event_id in removed_assignments(known, seen, self.state.due_dates()):
+                await queue.put(('eliminados', assignment_id, event_id, None, None))
+        log.info("📋 Entregas recibidas de Aules: %d", len(seen))
+
+    def _write(self, operations, http):
+        writer = CalendarBatchWriter(self.calendar.service, http=http)
+        for action, assignment_id, event_id, body, _ in operations:
+            key = (action, assignment_id)
+            if action == 'creados':
+                writer.insert(key, body)
+            elif action == 'actualizados':
+                writer.patch(key, event_id, body)
+            else:
+                writer.delete(key, event_id)
+        return writer.execute()
+
+    def _record(self, operations, results):
+        stored = {(op[0], op[1]): op[4] for op in operations}
+        for (action, assignment_id), result in results.items():
+            if not result.ok:
+                self.summary['errores'] += 1
+                log.error("❌ Error sincronizando la actividad %s: %s", assignment_id, result.error,
+                          extra={'actividad': assignment_id})
+                continue
+            if action == 'eliminados':
+                self.state.delete(assignment_id)
+            else:
+                self.state.upsert(assignment_id, result.response['id'], *stored[(action, assignment_id)])
+            self.summary[action] += 1
+            self.last_event_latency = time.perf_counter() - self.start
+            if self.first_event_latency is None:
+                self.first_event_latency = self.last_event_latency
+        self.state.commit()
+
+    async def _consume(self, queue):
+        http = self.calendar.new_http()
+        done = False
+        while not done:
+            operation = await queue.get()
+            if operation is _DONE:
+                break
+            operations = [operation]
+            while len(operations) < self.write_batch:
+                try:
+                    operation = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if operation is _DONE:
+                    done = True
+                    break
+                operations.append(operation)
+            results = await asyncio.to_thread(self._write, operations, http)
+            self._record(operations, results)
+
+    async def _close_queue(self, queue):
+        for _ in range(self.writers):
+            await queue.put(_DONE)
+
+    async def _watch(self, task, consumers):
+        # Espera a task, pero si antes falla un escritor nadie vaciaría la cola y put() no volvería nunca
+        pending = {task, *consumers}
+        while task in pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                if finished is not task and finished.exception():
+                    raise finished.exception()
+
+    async def run(self):
+        self.start = time.perf_counter()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        consumers = [asyncio.create_task(self._consume(queue)) for _ in range(self.writers)]
+        producer = asyncio.create_task(self._produce(queue))
+        closer = None
+        try:
+            await self._watch(producer, consumers)
+            # Aunque falle la lectura de Aules, los escritores terminan lo que ya está en la cola
+            closer = asyncio.create_task(self._close_queue(queue))
+            await self._watch(closer, consumers)
+            await asyncio.gather(*consumers)
+            producer.result()
+        finally:
+            tasks = [task for task in (producer, closer, *consumers) if task]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        timer = self.crawler.timer
+        timer.mark('pipeline_total', time.perf_counter() - self.start)
+        if self.first_event_latency is not None:
+            timer.mark('pipeline_primer_evento', self.first_event_latency)
+            timer.mark('pipeline_ultimo_evento', self.last_event_latency)
+            print(f"⏱️ Primer evento escrito a los {self.first_event_latency:.2f}s, "
+                  f"último a los {self.last_event_latency:.2f}s")
+        return self.summary
+
+
+def run_pipeline(crawler, calendar, state, delete_removed=False, **kwargs):
+    return asyncio.run(AsyncSyncPipeline(crawler, calendar, state, delete_removed, **kwargs).run())
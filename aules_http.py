@@ -0,0 +1,174 @@
+import re
+import json
+import logging
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from date_parser import parse_timestamp
+from assignment import Assignment
+from metrics import METRICS
+from config import AULES_BASE_URL, HTTP_POOL_SIZE, HTTP_TIMEOUT, TIMELINE_PAGE_SIZE, USER_AGENT
+
+LOGINTOKEN_RE = re.compile(r'name="logintoken"\s+value="([^"]+)"')
+SESSKEY_RE = re.compile(r'"sesskey":"([^"]+)"')
+ASSIGN_ID_RE = re.compile(r'id=(\d+)')
+
+log = logging.getLogger(__name__)
+
+
+class AulesSessionExpired(Exception):
+    pass
+
+
+def create_session(pool_size=HTTP_POOL_SIZE):
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET', 'POST']))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def assignment_from_event(event):
+    url = event.get('url', '')
+    id_match = ASSIGN_ID_RE.search(url)
+    course = event.get('course') or {}
+    return Assignment(
+        id=id_match.group(1) if id_match else None,
+        nombre=event.get('activityname') or event.get('name', ''),
+        fecha=parse_timestamp(event.get('timesort')),
+        curso=course.get('fullnamedisplay') or course.get('fullname'),
+        url=url,
+    )
+
+
+def assignments_from_events(events):
+    assignments = []
+    processed_ids = set()
+    for event in events:
+        if event.get('modulename') != 'assign':
+            continue
+        assignment_info = assignment_from_event(event)
+        if assignment_info.id not in processed_ids:
+            assignments.append(assignment_info)
+            processed_ids.add(assignment_info.id)
+    METRICS.inc('aules_entregas_analizadas_total', len(assignments), origen='ajax')
+    log.info("📋 Eventos de tareas recibidos por AJAX: %d", len(assignments))
+    return assignments
+
+
+class AulesHttpClient:
+    def __init__(self, username, password, base_url=AULES_BASE_URL, session=None):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.session = session or create_session()
+        self.sesskey = None
+
+    def login(self):
+        login_url = f"{self.base_url}/login/index.php"
+        try:
+            log.info("🌐 Iniciando sesión por HTTP en: %s", login_url)
+            response = self.session.get(login_url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            token_match = LOGINTOKEN_RE.search(response.text)
+            data = {
+                'username': self.username,
+                'password': self.password,
+                'anchor': '',
+            }
+            if token_match:
+                data['logintoken'] = token_match.group(1)
+            response = self.session.post(login_url, data=data, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            if '/login/' in response.url:
+                log.error("❌ Credenciales rechazadas por Aules")
+                return False
+            self.sesskey = self._find_sesskey(response.text)
+            if not self.sesskey:
+                response = self.session.get(f"{self.base_url}/my/", timeout=HTTP_TIMEOUT)
+                response.raise_for_status()
+                self.sesskey = self._find_sesskey(response.text)
+            if not self.sesskey:
+                log.error("❌ No se encontró la sesskey tras el login")
+                return False
+            log.info("✅ Login exitoso")
+            return True
+        except requests.RequestException as e:
+            log.error("💥 Error durante el login: %s", e)
+            return False
+
+    def resume_session(self, cookie):
+        self.session.cookies.set('MoodleSession', cookie['value'], path=cookie.get('path', '/'))
+        try:
+            response = self.session.get(f"{self.base_url}/my/", timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException:
+            return False
+        if '/login/' in response.url:
+            self.session.cookies.clear()
+            return False
+        self.sesskey = self._find_sesskey(response.text)
+        return self.sesskey is not None
+
+    def get_session_cookie(self):
+        for cookie in self.session.cookies:
+            if cookie.name == 'MoodleSession':
+                return {'value': cookie.value, 'path': cookie.path or '/'}
+        return None
+
+    def _find_sesskey(self, html):
+        match = SESSKEY_RE.search(html)
+        return match.group(1) if match else None
+
+    def call_ajax(self, methodname, args):
+        url = f"{self.base_url}/lib/ajax/service.php"
+        params = {'sesskey': self.sesskey, 'info': methodname}
+        payload = [{'index': 0, 'methodname': methodname, 'args': args}]
+        response = self.session.post(url, params=params, data=json.dumps(payload),
+                                     headers={'Content-Type': 'application/json'},
+                                     timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        result = response.json()
+        if isinstance(result, dict):
+            result = [result]
+        if result[0].get('error'):
+            exception = result[0].get('exception') or {}
+            if exception.get('errorcode') in ('servicerequireslogin', 'invalidsesskey'):
+                raise AulesSessionExpired(exception.get('message', 'Sesión caducada'))
+            raise RuntimeError(exception.get('message', 'Error en el servicio AJAX de Aules'))
+        return result[0].get('data')
+
+    def iter_timeline_pages(self, timesortfrom=None, page_size=TIMELINE_PAGE_SIZE):
+        if timesortfrom is None:
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            timesortfrom = int(today.timestamp())
+        after_id = None
+        while True:
+            args = {
+                'limitnum': page_size,
+                'timesortfrom': timesortfrom,
+                'limittononsuspendedevents': True,
+            }
+            if after_id:
+                args['aftereventid'] = after_id
+            data = self.call_ajax('core_calendar_get_action_events_by_timesort', args)
+            events = data.get('events', []) if data else []
+            if events:
+                yield events
+            if len(events) < page_size:
+                break
+            after_id = data.get('lastid') or events[-1].get('id')
+
+    def iter_timeline_events(self, timesortfrom=None, page_size=TIMELINE_PAGE_SIZE):
+        for events in self.iter_timeline_pages(timesortfrom, page_size):
+            yield from events
+
+    def get_timeline_events(self):
+        return list(self.iter_timeline_events())
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,191 @@
+import argparse
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dotenv import load_dotenv
+from webcrawler import AulesTimelineCrawler
+from cookie_store import CookieStore
+from cli import add_observability_arguments
+from logs import setup_logging
+from metrics import METRICS
+from config import AULES_USE_SELENIUM, BATCH_MAX_WORKERS, BATCH_ACCOUNT_TIMEOUT
+
+load_dotenv()
+
+
+def load_accounts(path):
+    accounts = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            username = (row.get('username') or '').strip()
+            password = row.get('password') or ''
+            if username and password:
+                accounts.append((username, password))
+    return accounts
+
+
+class ConcurrencyTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+class BatchCrawler:
+    def __init__(self, accounts, max_workers=BATCH_MAX_WORKERS, timeout=BATCH_ACCOUNT_TIMEOUT,
+                 use_selenium=AULES_USE_SELENIUM):
+        self.accounts = accounts
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.use_selenium = use_selenium
+        self.tracker = ConcurrencyTracker()
+        self.browser_pool = None
+        self.cookie_store = CookieStore()
+        self._started = {}
+        self._crawlers = {}
+
+    def _crawl_account(self, index, username, password):
+        with self.tracker:
+            self._started[index] = time.monotonic()
+            crawler = AulesTimelineCrawler(username, password, use_selenium=self.use_selenium,
+                                           browser_pool=self.browser_pool, cookie_store=self.cookie_store)
+            self._crawlers[index] = crawler
+            try:
+                assignments = crawler.crawl_assignments()
+                return {
+                    'usuario': username,
+                    'estado': 'ok',
+                    'entregas': [assignment.to_dict() for assignment in assignments],
+                    'segundos': round(time.monotonic() - self._started[index], 3),
+                    'tiempos': crawler.timer.to_dict(),
+                }
+            finally:
+                crawler.close()
+
+    def run(self):
+        if self.use_selenium:
+            from browser_pool import BrowserPool
+            self.browser_pool = BrowserPool(self.max_workers)
+            self.browser_pool.warm(min(self.max_workers, len(self.accounts)))
+        results = [None] * len(self.accounts)
+        batch_start = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            pending = {
+                executor.submit(self._crawl_account, i, username, password): i
+                for i, (username, password) in enumerate(self.accounts)
+            }
+            while pending:
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    username = self.accounts[index][0]
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        results[index] = self._failure(index, username, 'error', str(e))
+                now = time.monotonic()
+                for future, index in list(pending.items()):
+                    started = self._started.get(index)
+                    if started is not None and now - started > self.timeout:
+                        pending.pop(future)
+                        username = self.accounts[index][0]
+                        print(f"⏰ Tiempo agotado para {username} ({self.timeout}s)")
+                        crawler = self._crawlers.get(index)
+                        if crawler:
+                            try:
+                                crawler.abort()
+                            except Exception:
+                                pass
+                        results[index] = self._failure(index, username, 'timeout', f"Más de {self.timeout}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            pool_stats = self.browser_pool.stats() if self.browser_pool else None
+            if self.browser_pool:
+                self.browser_pool.close_all()
+        return {
+            'cuentas': results,
+            'segundos_totales': round(time.monotonic() - batch_start, 3),
+            'max_workers': self.max_workers,
+            'concurrencia_maxima': self.tracker.peak,
+            'motor': 'selenium' if self.use_selenium else 'http',
+            'pool': pool_stats,
+            'sesiones': self.cookie_store.stats(),
+        }
+
+    def _failure(self, index, username, estado, error):
+        started = self._started.get(index)
+        return {
+            'usuario': username,
+            'estado': estado,
+            'entregas': [],
+            'segundos': round(time.monotonic() - started, 3) if started else 0.0,
+            'error': error,
+        }
+
+
+def print_report(report):
+    print("\n" + "="*60)
+    print(f"📊 INFORME DEL LOTE ({report['motor']}, {report['max_workers']} workers)")
+    for result in report['cuentas']:
+        icono = {'ok': '✅', 'timeout': '⏰'}.get(result['estado'], '❌')
+        linea = f"   {icono} {result['usuario']}: {len(result['entregas'])} entregas en {result['segundos']:.2f}s"
+        if result.get('error'):
+            linea += f" ({result['error']})"
+        print(linea)
+    ok = sum(1 for r in report['cuentas'] if r['estado'] == 'ok')
+    print(f"\n⏱️ Tiempo total: {report['segundos_totales']:.2f}s")
+    print(f"👥 Cuentas correctas: {ok}/{len(report['cuentas'])}")
+    print(f"🔀 Concurrencia máxima alcanzada: {report['concurrencia_maxima']}")
+    sesiones = report['sesiones']
+    print(f"🍪 Logins evitados con sesión guardada: {sesiones['logins_evitados']} (logins completos: {sesiones['logins_completos']})")
+    if report.get('pool'):
+        pool = report['pool']
+        print(f"♻️ Pool de navegadores: {pool['aciertos']} aciertos, {pool['fallos']} fallos, {pool['descartados']} descartados")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrae las entregas de Aules para varias cuentas a la vez")
+    parser.add_argument('cuentas', help="CSV con columnas username,password")
+    parser.add_argument('--workers', type=int, default=BATCH_MAX_WORKERS,
+                        help="Número máximo de cuentas procesadas en paralelo")
+    parser.add_argument('--timeout', type=float, default=BATCH_ACCOUNT_TIMEOUT,
+                        help="Tiempo máximo por cuenta en segundos")
+    parser.add_argument('--selenium', action='store_true', default=AULES_USE_SELENIUM,
+                        help="Usar el pool de Chrome en lugar del cliente HTTP")
+    parser.add_argument('--informe', help="Ruta donde guardar el informe en JSON")
+    add_observability_arguments(parser)
+    args = parser.parse_args()
+    setup_logging(quiet=args.quiet, json_format=args.log_json)
+    if args.metricas_puerto:
+        METRICS.serve(args.metricas_puerto)
+
+    accounts = load_accounts(args.cuentas)
+    if not accounts:
+        print(f"❌ No se encontraron cuentas válidas en {args.cuentas}")
+        return
+    print(f"🚀 Procesando {len(accounts)} cuentas con {args.workers} workers...")
+    report = BatchCrawler(accounts, args.workers, args.timeout, args.selenium).run()
+    print_report(report)
+    if args.informe:
+        with open(args.informe, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        print(f"💾 Informe guardado en {args.informe}")
+    if args.metricas:
+        METRICS.write(args.metricas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from google.oauth2.credentials import Credentials
+from config import GOOGLE_TOKEN_FILE, GOOGLE_DISCOVERY_CACHE_FILE
+
+# Arranque anterior: pickle, build() y todas las dependencias de Google importadas al cargar el módulo
+LEGACY_SNIPPET = """
+import pickle, time
+start = time.perf_counter()
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+with open('token.json', 'rb') as token:
+    credentials = pickle.load(token)
+service = build('calendar', 'v3', credentials=credentials)
+print(time.perf_counter() - start)
+"""
+
+CURRENT_SNIPPET = """
+import time
+start = time.perf_counter()
+from calendar_manager import CalendarManager
+calendar = CalendarManager()
+assert calendar.service is not None
+print(time.perf_counter() - start)
+"""
+
+LAZY_SNIPPET = """
+import time
+start = time.perf_counter()
+from calendar_manager import CalendarManager
+calendar = CalendarManager()
+print(time.perf_counter() - start)
+"""
+
+
+def fake_credentials():
+    return Credentials(
+        token='bench-token',
+        refresh_token='bench-refresh',
+        client_id='bench.apps.googleusercontent.com',
+        client_secret='bench-secret',
+        token_uri='https://oauth2.googleapis.com/token',
+        scopes=['https://www.googleapis.com/auth/calendar'],
+        expiry=datetime.utcnow() + timedelta(hours=1),
+    )
+
+
+def write_token(directory, as_pickle):
+    path = os.path.join(directory, GOOGLE_TOKEN_FILE)
+    credentials = fake_credentials()
+    if as_pickle:
+        with open(path, 'wb') as token:
+            pickle.dump(credentials, token)
+    else:
+        with open(path, 'w', encoding='utf-8') as token:
+            token.write(credentials.to_json())
+
+
+def measure(directory, snippet):
+    env = {**os.environ, 'PYTHONPATH': ROOT_DIR}
+    result = subprocess.run([sys.executable, '-c', snippet], cwd=directory, env=env,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def run_scenario(name, repeticiones, prepare, snippet):
+    samples = []
+    for _ in range(repeticiones):
+        with tempfile.TemporaryDirectory() as directory:
+            prepare(directory)
+            samples.append(measure(directory, snippet))
+    samples.sort()
+    return {'escenario': name, 'p50': round(samples[len(samples) // 2], 4), 'min': round(samples[0], 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío y en caliente de CalendarManager")
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help="Emite los resultados en JSON")
+    args = parser.parse_args()
+
+    def legacy(directory):
+        write_token(directory, as_pickle=True)
+
+    def cold(directory):
+        write_token(directory, as_pickle=False)
+
+    def migration(directory):
+        write_token(directory, as_pickle=True)
+
+    def warm(directory):
+        write_token(directory, as_pickle=False)
+        measure(directory, CURRENT_SNIPPET)
+        assert os.path.exists(os.path.join(directory, GOOGLE_DISCOVERY_CACHE_FILE))
+
+    results = [
+        run_scenario('anterior (pickle + build)', args.repeticiones, legacy, LEGACY_SNIPPET),
+        run_scenario('frío (sin caché de discovery)', args.repeticiones, cold, CURRENT_SNIPPET),
+        run_scenario('migración desde pickle', args.repeticiones, migration, CURRENT_SNIPPET),
+        run_scenario('caliente (caché de discovery)', args.repeticiones, warm, CURRENT_SNIPPET),
+        run_scenario('perezoso (sin llamadas a la API)', args.repeticiones, warm, LAZY_SNIPPET),
+    ]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+    print(f"🚀 Arranque de CalendarManager hasta tener el servicio listo ({args.repeticiones} procesos por escenario)")
+    for result in results:
+        print(f"   {result['escenario']:<32} p50 {result['p50'] * 1000:7.1f} ms   mín {result['min'] * 1000:7.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import os
+import re
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from date_parser import parse_due_label, format_fecha
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'aria_labels.txt')
+
+
+def legacy_parse(aria_label):
+    meses_en = {'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+               'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12}
+    meses_es = {'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
+               'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12}
+    meses = {**meses_en, **meses_es}
+    fecha_pattern = r'vencerà el (\d{1,2})\s+(January|February|March|April|May|June|July|August|September|October|November|December|enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)\s+(\d{4}),\s+(\d{1,2}):(\d{2})\s+(AM|PM)'
+    fecha_match = re.search(fecha_pattern, aria_label, re.IGNORECASE)
+    if not fecha_match:
+        return None
+    hora_num = int(fecha_match.group(4))
+    am_pm = fecha_match.group(6).upper()
+    if am_pm == 'PM' and hora_num != 12:
+        hora_num += 12
+    elif am_pm == 'AM' and hora_num == 12:
+        hora_num = 0
+    fecha = datetime(int(fecha_match.group(3)), meses.get(fecha_match.group(2).lower(), 1),
+                     int(fecha_match.group(1)), hora_num, int(fecha_match.group(5)))
+    fecha.strftime('%d/%m/%Y')
+    fecha.strftime('%H:%M')
+    fecha.strftime('%d/%m/%Y %H:%M')
+    return fecha
+
+
+def current_parse(aria_label):
+    fecha = parse_due_label(aria_label)
+    format_fecha(fecha)
+    return fecha
+
+
+def measure(parser, labels, repeticiones):
+    segundos = timeit.timeit(lambda: [parser(label) for label in labels], number=repeticiones)
+    return segundos / (repeticiones * len(labels)) * 1e6
+
+
+def main():
+    with open(CORPUS_FILE, encoding='utf-8') as f:
+        corpus = [line.strip() for line in f if line.strip()]
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    comunes = [label for label in corpus if legacy_parse(label)]
+
+    print(f"📊 Corpus: {len(corpus)} etiquetas aria-label ({len(comunes)} reconocidas por el parser anterior)")
+    for nombre, parser in (('anterior', legacy_parse), ('precompilado', current_parse)):
+        reconocidas = sum(1 for label in corpus if parser(label))
+        total = measure(parser, corpus, repeticiones)
+        solo_comunes = measure(parser, comunes, repeticiones)
+        print(f"{nombre:>13}: {total:7.2f} µs/etiqueta (corpus), {solo_comunes:7.2f} µs/etiqueta (comunes), "
+              f"{reconocidas}/{len(corpus)} fechas reconocidas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+os.environ['TZ'] = 'Europe/Madrid'
+if hasattr(time, 'tzset'):
+    time.tzset()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webcrawler import AulesTimelineCrawler
+from timeline_html import available_backends, available_extractors, extract_event_list
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SAMPLE_FILE = os.path.join(DATA_DIR, 'timeline_sample.html')
+GOLDEN_FILE = os.path.join(DATA_DIR, 'timeline_golden.json')
+
+
+def serialize(assignments):
+    # El golden guarda la hora local de Aules sin zona horaria
+    return [{**a, 'fecha': a.fecha.replace(tzinfo=None).isoformat() if a.fecha else None} for a in assignments]
+
+
+def extract(html, backend, subtree):
+    crawler = AulesTimelineCrawler('bench', 'bench', use_selenium=True, parser_backend=backend, subtree_parse=subtree)
+    return crawler.extract_assignments_from_timeline(html)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los backends de análisis HTML de la cronología")
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--actualizar-golden', action='store_true',
+                        help="Regenera el fichero golden con html.parser sobre la página completa")
+    args = parser.parse_args()
+
+    with open(SAMPLE_FILE, encoding='utf-8') as f:
+        html = f.read()
+
+    devnull = open(os.devnull, 'w')
+    stdout = sys.stdout
+    if args.actualizar_golden:
+        sys.stdout = devnull
+        golden = serialize(extract(html, 'html.parser', False))
+        sys.stdout = stdout
+        with open(GOLDEN_FILE, 'w', encoding='utf-8') as f:
+            json.dump(golden, f, ensure_ascii=False, indent=2)
+        print(f"💾 Golden actualizado con {len(golden)} entregas")
+        return 0
+
+    with open(GOLDEN_FILE, encoding='utf-8') as f:
+        golden = json.load(f)
+
+    print(f"📄 {os.path.basename(SAMPLE_FILE)}: {len(html) / 1024:.0f} KiB, {len(golden)} entregas esperadas")
+    errores = 0
+    for backend in available_backends():
+        for subtree in (False, True):
+            sys.stdout = devnull
+            try:
+                resultado = serialize(extract(html, backend, subtree))
+                segundos = timeit.timeit(lambda: extract(html, backend, subtree), number=args.repeticiones)
+                tracemalloc.start()
+                extract(html, backend, subtree)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            finally:
+                sys.stdout = stdout
+            igual = resultado == golden
+            errores += not igual
+            modo = 'subárbol' if subtree else 'completo'
+            print(f"{backend:>12} {modo:>9}: {segundos / args.repeticiones * 1000:8.2f} ms, "
+                  f"pico {pico / 1024 / 1024:6.2f} MiB, {'✅ igual al golden' if igual else '❌ DIFERENTE del golden'}")
+    # El recorte del subárbol es independiente del backend: se mide aparte con cada método
+    referencia = extract_event_list(html, 'regex')
+    for extractor in available_extractors():
+        segundos = timeit.timeit(lambda: extract_event_list(html, extractor), number=args.repeticiones)
+        fragmento = extract_event_list(html, extractor)
+        # selectolax vuelve a serializar el HTML: basta con que el subárbol dé las mismas entregas
+        with contextlib.redirect_stdout(devnull):
+            igual = serialize(extract(fragmento, 'html.parser', False)) == golden if fragmento else False
+        errores += not igual
+        print(f"{'recorte':>12} {extractor:>9}: {segundos / args.repeticiones * 1000:8.2f} ms, "
+              f"{len(fragmento or '') / 1024:6.0f} KiB de {len(html) / 1024:.0f}, "
+              f"{'✅ igual al golden' if igual else '❌ DIFERENTE del golden'}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+HEAVY_MODULES = ('selenium', 'webdriver_manager', 'bs4', 'lxml', 'selectolax', 'googleapiclient', 'google',
+                 'google_auth_oauthlib', 'httplib2')
+
+# Presupuesto en milisegundos (acumulado de importar el módulo, mejor de varias ejecuciones)
+# y módulos que no se deben cargar en ese camino
+CASES = [
+    {'nombre': 'cli.py --help', 'comando': ['cli.py', '--help'], 'modulo': None,
+     'presupuesto_ms': None, 'prohibidos': HEAVY_MODULES + ('requests', 'webcrawler')},
+    {'nombre': 'import cli', 'comando': ['-c', 'import cli'], 'modulo': 'cli',
+     'presupuesto_ms': 40, 'prohibidos': HEAVY_MODULES + ('requests', 'webcrawler')},
+    {'nombre': 'import calendar_manager', 'comando': ['-c', 'import calendar_manager'], 'modulo': 'calendar_manager',
+     'presupuesto_ms': 100, 'prohibidos': ('googleapiclient.discovery', 'google_auth_oauthlib', 'google.oauth2',
+                                           'selenium', 'bs4')},
+    {'nombre': 'import webcrawler', 'comando': ['-c', 'import webcrawler'], 'modulo': 'webcrawler',
+     'presupuesto_ms': 300, 'prohibidos': ('selenium', 'webdriver_manager', 'bs4', 'lxml', 'selectolax',
+                                           'googleapiclient.discovery', 'google_auth_oauthlib')},
+]
+
+
+def imported_modules(command):
+    env = {**os.environ, 'PYTHONPATH': ROOT_DIR}
+    result = subprocess.run([sys.executable, '-X', 'importtime', *command], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return modules
+
+
+def forbidden_found(modules, forbidden):
+    return sorted(name for name in modules if any(name == f or name.startswith(f + '.') for f in forbidden))
+
+
+def check(case, repeticiones):
+    best = None
+    for _ in range(repeticiones):
+        modules = imported_modules(case['comando'])
+        found = forbidden_found(modules, case['prohibidos'])
+        if found:
+            return None, f"importa {', '.join(found[:5])}{'...' if len(found) > 5 else ''}"
+        if case['modulo']:
+            elapsed = modules.get(case['modulo'])
+            best = elapsed if best is None else min(best, elapsed)
+    if case['presupuesto_ms'] and best > case['presupuesto_ms']:
+        return best, f"{best:.1f} ms supera el presupuesto de {case['presupuesto_ms']} ms"
+    return best, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprueba el coste de importación con -X importtime")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    errores = 0
+    for case in CASES:
+        elapsed, error = check(case, args.repeticiones)
+        tiempo = f"{elapsed:7.1f} ms" if elapsed is not None else ' ' * 10
+        presupuesto = f"(presupuesto {case['presupuesto_ms']} ms)" if case['presupuesto_ms'] else ''
+        if error:
+            errores += 1
+            print(f"❌ {case['nombre']:<26} {tiempo} {error}")
+        else:
+            print(f"✅ {case['nombre']:<26} {tiempo} {presupuesto}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
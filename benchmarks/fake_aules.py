@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from date_parser import AULES_TZ
+
+SESSKEY = 'bench-sesskey'
+SESSION_COOKIE = 'bench-session'
+CURSOS = ["Desplegament d'aplicacions web", "Disseny d'interfícies web", "Accés a dades",
+          "Programació de serveis i processos", "Sistemes de gestió empresarial"]
+MESOS = ['gener', 'febrer', 'març', 'abril', 'maig', 'juny', 'juliol', 'agost', 'setembre', 'octubre', 'novembre', 'desembre']
+
+
+def build_events(count, base_url, start=None):
+    start = start or int(time.time()) + 3600
+    events = []
+    for i in range(count):
+        cmid = 10000 + i
+        events.append({
+            'id': i + 1,
+            'name': f"Tasca {i + 1} venç",
+            'activityname': f"Tasca {i + 1}",
+            'modulename': 'assign',
+            'instance': cmid,
+            'timesort': start + i * 3600,
+            'url': f"{base_url}/mod/assign/view.php?id={cmid}",
+            'course': {'id': i % len(CURSOS) + 1, 'fullname': CURSOS[i % len(CURSOS)]},
+        })
+    return events
+
+
+def render_timeline(events):
+    parts = ['<div data-region="event-list-content">']
+    for event in events:
+        # Como Aules, las etiquetas muestran la hora de Madrid sea cual sea la zona del equipo
+        fecha = datetime.fromtimestamp(event['timesort'], AULES_TZ)
+        aria = (f"{event['activityname']} en {event['course']['fullname']} vencerà el "
+                f"{fecha.day} de {MESOS[fecha.month - 1]} de {fecha.year}, {fecha.hour}:{fecha.minute:02d}")
+        parts.append(
+            f'<div class="mb-3" data-region="event-list-content-date" data-timestamp="{event["timesort"]}">'
+            f'<div class="list-group list-group-flush"><div class="list-group-item timeline-event-list-item" data-region="event-list-item">'
+            f'<div class="event-name-container"><h6 class="event-name mb-0"><a href="{event["url"]}" aria-label="{aria}">{event["activityname"]}</a></h6>'
+            f'<small class="mb-0">Venciment de la tasca · {event["course"]["fullname"]}</small></div></div></div></div>'
+        )
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+class FakeAulesHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', content_type='text/html; charset=utf-8', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _logged_in(self):
+        return f"MoodleSession={SESSION_COOKIE}" in self.headers.get('Cookie', '')
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/login/index.php':
+            body = ('<form id="login" method="post"><input type="hidden" name="logintoken" value="bench-token">'
+                    '<input id="username" name="username"><input id="password" name="password" type="password">'
+                    '<button id="loginbtn" type="submit">Entrar</button></form>')
+            self._send(200, body.encode('utf-8'))
+        elif path in ('/my/', '/my'):
+            if not self._logged_in():
+                self._send(303, headers={'Location': '/login/index.php'})
+                return
+            body = (f'<html><head><script>M.cfg = {{"sesskey":"{SESSKEY}"}};</script></head><body>'
+                    f'<section class="block_timeline block">{self.server.timeline_html}</section></body></html>')
+            self._send(200, body.encode('utf-8'))
+        else:
+            self._send(404)
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        data = self.rfile.read(length)
+        if parsed.path == '/login/index.php':
+            self._send(303, headers={'Location': '/my/', 'Set-Cookie': f"MoodleSession={SESSION_COOKIE}; Path=/"})
+        elif parsed.path == '/lib/ajax/service.php':
+            if not self._logged_in() or parse_qs(parsed.query).get('sesskey') != [SESSKEY]:
+                result = [{'error': True, 'exception': {'errorcode': 'servicerequireslogin', 'message': 'Login'}}]
+            else:
+                result = [self._ajax(call) for call in json.loads(data)]
+            self._send(200, json.dumps(result).encode('utf-8'), 'application/json')
+        else:
+            self._send(404)
+
+    def _ajax(self, call):
+        args = call.get('args', {})
+        if call['methodname'] == 'core_calendar_get_action_events_by_timesort':
+            after = args.get('aftereventid') or 0
+            events = self.server.events[after:after + args.get('limitnum', 50)]
+            return {'error': False, 'data': {'events': events, 'firstid': events[0]['id'] if events else 0,
+                                             'lastid': events[-1]['id'] if events else 0}}
+        if call['methodname'] == 'core_course_get_enrolled_courses_by_timeline_classification':
+            return {'error': False, 'data': {'courses': [], 'nextoffset': 0}}
+        return {'error': True, 'exception': {'errorcode': 'invalidrecord', 'message': call['methodname']}}
+
+
+class FakeAulesServer:
+    def __init__(self, event_count):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeAulesHandler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.httpd.events = build_events(event_count, self.base_url)
+        self.httpd.timeline_html = render_timeline(self.httpd.events)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def dashboard_html(self):
+        return f'<html><body><section class="block_timeline block">{self.httpd.timeline_html}</section></body></html>'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
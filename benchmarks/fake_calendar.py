@@ -0,0 +1,167 @@
+import itertools
+import json
+import re
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from googleapiclient.discovery_cache import get_static_doc
+
+EVENT_PATH_RE = re.compile(r'^/calendar/v3/calendars/(?P<calendar>[^/]+)/events(?:/(?P<event>[^/?]+))?$')
+BLANK_LINE_RE = re.compile(rb'\r?\n\r?\n')
+DISCOVERY_PATH = '/discovery/v1/apis/calendar/v3/rest'
+
+
+class FakeCalendarHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_GET(self):
+        if urlparse(self.path).path == DISCOVERY_PATH:
+            self._send(200, self.server.discovery.encode('utf-8'))
+            return
+        self._dispatch('GET', self.path, b'')
+
+    def do_POST(self):
+        body = self._read_body()
+        if urlparse(self.path).path == '/batch/calendar/v3':
+            self._batch(body)
+            return
+        self._dispatch('POST', self.path, body)
+
+    def do_PATCH(self):
+        self._dispatch('PATCH', self.path, self._read_body())
+
+    def do_DELETE(self):
+        self._dispatch('DELETE', self.path, b'')
+
+    def _dispatch(self, method, path, body):
+        status, payload = self.server.calendar.handle(method, path, body)
+        self._send(status, json.dumps(payload).encode('utf-8') if payload is not None else b'')
+
+    def _batch(self, body):
+        content_type = self.headers['Content-Type']
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + body
+        )
+        boundary = 'batch_bench_boundary'
+        parts = []
+        for part in message.iter_parts():
+            raw = part.get_payload(decode=True)
+            head, sub_body = (BLANK_LINE_RE.split(raw, 1) + [b''])[:2]
+            request_line = head.splitlines()[0].decode('utf-8')
+            method, path, _ = request_line.split(' ', 2)
+            status, payload = self.server.calendar.handle(method, path, sub_body)
+            content = json.dumps(payload) if payload is not None else ''
+            content_id = part['Content-ID'].strip('<>')
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\nContent-Length: {len(content)}\r\n\r\n"
+                f"{content}\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n")
+        self._send(200, ''.join(parts).encode('utf-8'), f'multipart/mixed; boundary={boundary}')
+
+
+class FakeCalendar:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.events = {}
+            self._ids = itertools.count(1)
+            self.calls = 0
+
+    def _list(self, query):
+        page_size = int(query.get('maxResults', ['250'])[0])
+        offset = int(query.get('pageToken', ['0'])[0])
+        items = list(self.events.values())
+        if 'privateExtendedProperty' in query:
+            name, _, value = query['privateExtendedProperty'][0].partition('=')
+            items = [item for item in items
+                     if item.get('extendedProperties', {}).get('private', {}).get(name) == value]
+        page = {'kind': 'calendar#events', 'items': items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            page['nextPageToken'] = str(offset + page_size)
+        return page
+
+    def handle(self, method, path, body):
+        parsed = urlparse(path)
+        match = EVENT_PATH_RE.match(parsed.path)
+        if not match:
+            return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+        event_id = match.group('event')
+        data = json.loads(body) if body.strip() else {}
+        with self._lock:
+            self.calls += 1
+            if method == 'POST' and not event_id:
+                event_id = data.get('id') or f"bench{next(self._ids)}"
+                if event_id in self.events:
+                    return 409, {'error': {'code': 409, 'message': 'The requested identifier already exists.',
+                                           'errors': [{'reason': 'duplicate'}]}}
+                event = {**data, 'id': event_id, 'status': 'confirmed',
+                         'htmlLink': f"https://calendar.google.com/event?eid={event_id}"}
+                self.events[event_id] = event
+                return 200, event
+            if method == 'GET' and not event_id:
+                return 200, self._list(parse_qs(parsed.query))
+            if event_id not in self.events:
+                return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+            if method == 'PATCH':
+                self.events[event_id].update(data)
+                return 200, self.events[event_id]
+            if method == 'DELETE':
+                del self.events[event_id]
+                return 204, None
+            return 200, self.events[event_id]
+
+
+class FakeCalendarServer:
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeCalendarHandler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        discovery = json.loads(get_static_doc('calendar', 'v3'))
+        discovery['rootUrl'] = f"{self.base_url}/"
+        discovery['baseUrl'] = f"{self.base_url}/calendar/v3/"
+        self.httpd.discovery = json.dumps(discovery)
+        self.httpd.calendar = FakeCalendar()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def calendar(self):
+        return self.httpd.calendar
+
+    @property
+    def discovery_url(self):
+        return self.base_url + '/discovery/v1/apis/{api}/{apiVersion}/rest'
+
+    def build_service(self):
+        import httplib2
+        from googleapiclient.discovery import build
+        return build('calendar', 'v3', http=httplib2.Http(), discoveryServiceUrl=self.discovery_url,
+                     static_discovery=False, cache_discovery=False)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,196 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_aules import FakeAulesServer
+from fake_calendar import FakeCalendarServer
+from webcrawler import AulesTimelineCrawler
+from calendar_manager import CalendarManager
+from sync_state import SyncState
+from timings import PhaseTimer
+from async_pipeline import run_pipeline
+from remote_index import RemoteEventIndex
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+LATEST_FILE = os.path.join(RESULTS_DIR, 'latest.json')
+BASELINE_FILE = os.path.join(RESULTS_DIR, 'baseline.json')
+DEFAULT_SIZES = '10,100,1000,5000'
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    index = (len(ordered) - 1) * pct / 100
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux da KiB y macOS bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def bench_calendar(calendar_service):
+    calendar = CalendarManager(service=calendar_service)
+    calendar.remote_index = RemoteEventIndex(calendar_service)
+    return calendar
+
+
+def run_once(aules, calendar_service, size):
+    timer = PhaseTimer()
+    crawler = AulesTimelineCrawler('bench', 'bench', use_selenium=False)
+    crawler.base_url = crawler.http_client.base_url = aules.base_url
+    crawler.timer = timer
+    parser = AulesTimelineCrawler('bench', 'bench', use_selenium=True)
+    state = SyncState(':memory:')
+    try:
+        assignments = crawler.crawl_assignments()
+        with timer.phase('analisis_html'):
+            parsed = parser.extract_assignments_from_timeline(aules.dashboard_html)
+        if len(assignments) != size or len(parsed) != size:
+            raise RuntimeError(f"Se esperaban {size} entregas: HTTP {len(assignments)}, HTML {len(parsed)}")
+        calendar = bench_calendar(calendar_service)
+        with timer.phase('sincronizacion_inicial'):
+            summary = calendar.sync_assignments(assignments, state)
+        if summary is None or summary['creados'] != size:
+            raise RuntimeError(f"La sincronización inicial no creó {size} eventos: {summary}")
+        with timer.phase('sincronizacion_sin_cambios'):
+            calendar.sync_assignments(assignments, state)
+    finally:
+        state.close()
+        crawler.close()
+    return timer
+
+
+def run_async(aules, calendar_service, size):
+    crawler = AulesTimelineCrawler('bench', 'bench', use_selenium=False)
+    crawler.base_url = crawler.http_client.base_url = aules.base_url
+    state = SyncState(':memory:')
+    try:
+        summary = run_pipeline(crawler, bench_calendar(calendar_service), state)
+    finally:
+        state.close()
+        crawler.close()
+    if summary['creados'] != size:
+        raise RuntimeError(f"El pipeline asíncrono no creó {size} eventos: {summary}")
+    return crawler.timer
+
+
+def bench_size(size, repeticiones):
+    samples = {}
+    with FakeAulesServer(size) as aules, FakeCalendarServer() as fake_calendar:
+        calendar_service = fake_calendar.build_service()
+        for _ in range(repeticiones):
+            with contextlib.redirect_stdout(io.StringIO()):
+                fake_calendar.calendar.reset()
+                timer = run_once(aules, calendar_service, size)
+                fake_calendar.calendar.reset()
+                marks = run_async(aules, calendar_service, size).marks
+            for phase in timer.phases:
+                samples.setdefault(phase['fase'], []).append(phase['segundos'])
+            samples.setdefault('total', []).append(timer.total())
+            for name, seconds in marks.items():
+                samples.setdefault(name, []).append(seconds)
+    fases = {
+        name: {
+            'p50': round(percentile(values, 50), 4),
+            'p95': round(percentile(values, 95), 4),
+        }
+        for name, values in samples.items()
+    }
+    total_p50 = fases['total']['p50']
+    return {
+        'eventos': size,
+        'fases': fases,
+        'eventos_por_segundo': round(size / total_p50, 1) if total_p50 else None,
+        'pico_rss_mib': round(peak_rss_mib(), 1),
+    }
+
+
+def compare(results, baseline, umbral):
+    regresiones = []
+    previous = {str(entry['eventos']): entry for entry in baseline.get('resultados', [])}
+    for entry in results:
+        old = previous.get(str(entry['eventos']))
+        if not old:
+            continue
+        for fase, values in entry['fases'].items():
+            old_p50 = old['fases'].get(fase, {}).get('p50')
+            # Por debajo de 10 ms el ruido del planificador domina la medida
+            if not old_p50 or max(old_p50, values['p50']) < 0.01:
+                continue
+            if values['p50'] > old_p50 * umbral:
+                regresiones.append(f"{entry['eventos']} eventos, {fase}: {old_p50:.3f}s → {values['p50']:.3f}s")
+    return regresiones
+
+
+def print_results(results):
+    for entry in results:
+        print(f"\n📦 {entry['eventos']} eventos: {entry['eventos_por_segundo']} eventos/s, "
+              f"pico RSS {entry['pico_rss_mib']} MiB")
+        for fase, values in entry['fases'].items():
+            print(f"   {fase:<28} p50 {values['p50']:8.3f}s   p95 {values['p95']:8.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo contra Aules y Google Calendar simulados")
+    parser.add_argument('--tamanos', default=DEFAULT_SIZES,
+                        help=f"Número de eventos de la cronología, separados por comas (por defecto {DEFAULT_SIZES})")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--umbral', type=float, default=1.5,
+                        help="Factor sobre la p50 de la referencia a partir del cual se considera regresión")
+    parser.add_argument('--guardar-baseline', action='store_true',
+                        help="Guarda estos resultados como nueva referencia")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.tamanos.split(',') if size.strip()]
+    results = []
+    for size in sizes:
+        print(f"⏱️ Midiendo {size} eventos ({args.repeticiones} repeticiones)...")
+        results.append(bench_size(size, args.repeticiones))
+    print_results(results)
+
+    report = {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'repeticiones': args.repeticiones,
+        'resultados': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(LATEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados guardados en {os.path.relpath(LATEST_FILE)}")
+
+    if args.guardar_baseline:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Referencia actualizada en {os.path.relpath(BASELINE_FILE)}")
+        return 0
+    if not os.path.exists(BASELINE_FILE):
+        print("ℹ️ No hay referencia guardada, usa --guardar-baseline para crearla")
+        return 0
+    with open(BASELINE_FILE, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regresiones = compare(results, baseline, args.umbral)
+    if regresiones:
+        print(f"\n❌ Regresiones de más de {args.umbral}x respecto a la referencia:")
+        for regresion in regresiones:
+            print(f"   {regresion}")
+        return 1
+    print(f"\n✅ Sin regresiones respecto a la referencia ({baseline.get('fecha')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
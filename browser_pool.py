@@ -0,0 +1,126 @@
+import logging
+import queue
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from config import USER_AGENT
+
+log = logging.getLogger(__name__)
+
+
+def build_chrome_options(performance_logs=False):
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+    if performance_logs:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return chrome_options
+
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def create_driver(chrome_options=None):
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            log.info("🔧 Configurando ChromeDriver automáticamente...")
+            _driver_path = ChromeDriverManager().install()
+    service = Service(_driver_path)
+    return webdriver.Chrome(service=service, options=chrome_options or build_chrome_options())
+
+
+class BrowserPool:
+    def __init__(self, size, chrome_options=None):
+        self.size = size
+        self.chrome_options = chrome_options or build_chrome_options()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._drivers = []
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def warm(self, count=None):
+        count = min(count or self.size, self.size)
+        with self._lock:
+            missing = count - len(self._drivers)
+        for _ in range(max(missing, 0)):
+            driver = create_driver(self.chrome_options)
+            with self._lock:
+                self._drivers.append(driver)
+            self._idle.put(driver)
+        log.info("🔥 Pool de navegadores precalentado con %d instancias", count)
+
+    def acquire(self, timeout=None):
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No hay navegadores libres en el pool")
+        try:
+            driver = self._idle.get_nowait()
+            with self._lock:
+                self.hits += 1
+            return driver
+        except queue.Empty:
+            pass
+        try:
+            driver = create_driver(self.chrome_options)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+            self.misses += 1
+        return driver
+
+    def release(self, driver):
+        try:
+            with self._lock:
+                alive = driver in self._drivers
+            if alive:
+                driver.delete_all_cookies()
+                self._idle.put(driver)
+        except Exception:
+            self.discard(driver)
+        finally:
+            self._slots.release()
+
+    def release_slot(self):
+        self._slots.release()
+
+    def discard(self, driver):
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self.discarded += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'aciertos': self.hits,
+                'fallos': self.misses,
+                'descartados': self.discarded,
+                'vivos': len(self._drivers),
+            }
+
+    def close_all(self):
+        with self._lock:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        log.info("🔒 Pool de navegadores cerrado (%d instancias)", len(drivers))
@@ -0,0 +1,167 @@
+import json
+import logging
+import random
+import time
+import uuid
+from googleapiclient.errors import HttpError
+from config import CALENDAR_ID, CALENDAR_BATCH_SIZE, CALENDAR_MAX_RETRIES, CALENDAR_RETRY_BASE_DELAY
+from metrics import METRICS
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'quotaExceeded'}
+MAX_BACKOFF = 32
+
+log = logging.getLogger(__name__)
+
+
+def _error_reasons(error):
+    try:
+        content = json.loads(error.content.decode('utf-8'))
+    except (AttributeError, ValueError, UnicodeDecodeError):
+        return set()
+    errors = (content.get('error') or {}).get('errors') or []
+    return {item.get('reason') for item in errors}
+
+
+def error_label(error):
+    return str(error.resp.status) if isinstance(error, HttpError) else 'error'
+
+
+def execute_request(request, operation):
+    with METRICS.timed('calendar_llamada_segundos', operacion=operation):
+        try:
+            response = request.execute()
+        except Exception as e:
+            METRICS.inc('calendar_llamadas_total', operacion=operation, resultado=error_label(e))
+            raise
+    METRICS.inc('calendar_llamadas_total', operacion=operation, resultado='ok')
+    return response
+
+
+def with_event_id(body):
+    # Id generado en el cliente: si un lote llegó a aplicarse antes de perder la conexión,
+    # el reintento responde 409 en lugar de crear un evento duplicado
+    return body if body.get('id') else {**body, 'id': uuid.uuid4().hex}
+
+
+def is_retryable(error):
+    if not isinstance(error, HttpError):
+        # Solo fallos de red (socket.timeout y los errores SSL son OSError); lo demás es un error del código.
+        # httplib2 se importa aquí porque cuesta más que el resto de calendar_manager
+        import httplib2
+        return isinstance(error, (OSError, httplib2.HttpLib2Error))
+    status = error.resp.status
+    if status in RETRYABLE_STATUS:
+        return True
+    return status == 403 and bool(_error_reasons(error) & RATE_LIMIT_REASONS)
+
+
+class BatchResult:
+    def __init__(self, key, ok, response=None, error=None):
+        self.key = key
+        self.ok = ok
+        self.response = response
+        self.error = error
+
+
+class CalendarBatchWriter:
+    def __init__(self, service, calendar_id=CALENDAR_ID, chunk_size=CALENDAR_BATCH_SIZE,
+                 max_retries=CALENDAR_MAX_RETRIES, base_delay=CALENDAR_RETRY_BASE_DELAY, http=None):
+        self.service = service
+        self.http = http
+        self.calendar_id = calendar_id
+        self.chunk_size = min(chunk_size, 50)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._operations = []
+        self.retries = 0
+
+    def insert(self, key, body):
+        self._operations.append((key, 'insert', None, with_event_id(body)))
+
+    def patch(self, key, event_id, body):
+        self._operations.append((key, 'patch', event_id, body))
+
+    def delete(self, key, event_id):
+        self._operations.append((key, 'delete', event_id, None))
+
+    def _build_request(self, operation):
+        _, method, event_id, body = operation
+        events = self.service.events()
+        if method == 'insert':
+            return events.insert(calendarId=self.calendar_id, body=body)
+        if method == 'patch':
+            return events.patch(calendarId=self.calendar_id, eventId=event_id, body=body)
+        return events.delete(calendarId=self.calendar_id, eventId=event_id)
+
+    def _run_chunk(self, chunk, results, retry, fallback):
+        answered = set()
+
+        def callback(request_id, response, exception):
+            operation = chunk[int(request_id)]
+            key, method, event_id, body = operation
+            answered.add(key)
+            METRICS.inc('calendar_llamadas_total', operacion=method,
+                        resultado='ok' if exception is None else error_label(exception))
+            if exception is None:
+                results[key] = BatchResult(key, True, response)
+            elif isinstance(exception, HttpError) and exception.resp.status == 409 and method == 'insert':
+                # Un intento anterior ya creó el evento con este id
+                results[key] = BatchResult(key, True, {'id': body['id']})
+            elif isinstance(exception, HttpError) and exception.resp.status in (404, 410) and method != 'insert':
+                if method == 'patch':
+                    fallback.append((key, 'insert', None, with_event_id(body)))
+                else:
+                    results[key] = BatchResult(key, True)
+            elif is_retryable(exception):
+                retry.append(operation)
+                results[key] = BatchResult(key, False, error=exception)
+            else:
+                results[key] = BatchResult(key, False, error=exception)
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for index, operation in enumerate(chunk):
+            batch.add(self._build_request(operation), request_id=str(index))
+        try:
+            with METRICS.timed('calendar_llamada_segundos', operacion='batch'):
+                batch.execute(http=self.http)
+        except Exception as e:
+            # Las operaciones que ya tienen respuesta en este lote conservan su resultado
+            for operation in chunk:
+                key = operation[0]
+                if key in answered:
+                    continue
+                results[key] = BatchResult(key, False, error=e)
+                if is_retryable(e):
+                    retry.append(operation)
+
+    def execute(self):
+        operations, self._operations = self._operations, []
+        results = {}
+        if not operations:
+            return results
+        start = time.perf_counter()
+        pending = operations
+        for attempt in range(self.max_retries + 1):
+            retry = []
+            while pending:
+                fallback = []
+                for i in range(0, len(pending), self.chunk_size):
+                    self._run_chunk(pending[i:i + self.chunk_size], results, retry, fallback)
+                pending = fallback
+            if not retry:
+                break
+            if attempt == self.max_retries:
+                log.error("❌ %d operaciones fallaron tras %d reintentos", len(retry), self.max_retries)
+                break
+            delay = min(self.base_delay * (2 ** attempt), MAX_BACKOFF) + random.uniform(0, self.base_delay)
+            log.warning("⏳ Reintentando %d operaciones en %.1fs (intento %d/%d)",
+                        len(retry), delay, attempt + 1, self.max_retries)
+            self.retries += len(retry)
+            METRICS.inc('calendar_reintentos_total', len(retry))
+            time.sleep(delay)
+            pending = retry
+        elapsed = time.perf_counter() - start
+        log.info("⚡ %d operaciones en %.2fs (%.1f eventos/s)", len(operations), elapsed,
+                 len(operations) / elapsed if elapsed else 0)
+        return results
@@ -1,126 +1,317 @@
+import logging
 import os
 import pickle
+import time
 from datetime import datetime, timedelta
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from config import GOOGLE_CREDENTIALS_FILE, GOOGLE_TOKEN_FILE, CALENDAR_ID, EVENT_DURATION_HOURS
+from config import (GOOGLE_CREDENTIALS_FILE, GOOGLE_TOKEN_FILE, GOOGLE_DISCOVERY_CACHE_FILE, DISCOVERY_CACHE_MAX_AGE,
+                    TOKEN_REFRESH_MARGIN, CALENDAR_ID, EVENT_DURATION_HOURS, AULES_TIMEZONE)
+from sync_state import assignment_hash, compute_plan, due_timestamp
+from calendar_batch import CalendarBatchWriter, execute_request
+from remote_index import RemoteEventIndex, tag_properties
+from date_parser import format_fecha
+from assignment import as_assignment
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest'
+
+log = logging.getLogger(__name__)
+
+
+def needs_refresh(credentials, margin=TOKEN_REFRESH_MARGIN):
+    if not credentials.token:
+        return True
+    if credentials.expiry is None:
+        return False
+    return credentials.expiry - datetime.utcnow() < timedelta(seconds=margin)
 
 
 class CalendarManager:
-    def __init__(self):
-        self.service = None
+    def __init__(self, service=None):
+        self._service = service
+        self._connect_failed = False
         self.credentials = None
-        self._authenticate()
+        self.remote_index = None
     
-    def _authenticate(self):
-        SCOPES = ['https://www.googleapis.com/auth/calendar']
-        if os.path.exists(GOOGLE_TOKEN_FILE):
+    @property
+    def service(self):
+        # La autenticación y la construcción del cliente se aplazan hasta la primera llamada a la API
+        if self._service is None and not self._connect_failed:
+            self._authenticate()
+            self._connect_failed = self._service is None
+        return self._service
+    
+    @service.setter
+    def service(self, service):
+        self._service = service
+    
+    def _load_credentials(self):
+        from google.oauth2.credentials import Credentials
+        if not os.path.exists(GOOGLE_TOKEN_FILE):
+            return None
+        try:
+            return Credentials.from_authorized_user_file(GOOGLE_TOKEN_FILE, SCOPES)
+        except (ValueError, UnicodeDecodeError):
+            pass
+        # Las versiones anteriores guardaban las credenciales con pickle en el mismo fichero
+        try:
             with open(GOOGLE_TOKEN_FILE, 'rb') as token:
-                self.credentials = pickle.load(token)
-        if not self.credentials or not self.credentials.valid:
-            if self.credentials and self.credentials.expired and self.credentials.refresh_token:
-                self.credentials.refresh(Request())
+                credentials = pickle.load(token)
+        except Exception as e:
+            log.warning("⚠️ No se pudo leer %s: %s", GOOGLE_TOKEN_FILE, e)
+            return None
+        self._save_credentials(credentials)
+        log.info("🔁 %s convertido de pickle a JSON", GOOGLE_TOKEN_FILE)
+        return credentials
+    
+    def _save_credentials(self, credentials):
+        tmp_path = f"{GOOGLE_TOKEN_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as token:
+            token.write(credentials.to_json())
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, GOOGLE_TOKEN_FILE)
+    
+    def _discovery_document(self):
+        path = GOOGLE_DISCOVERY_CACHE_FILE
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < DISCOVERY_CACHE_MAX_AGE:
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        from googleapiclient.discovery_cache import get_static_doc
+        document = get_static_doc('calendar', 'v3')
+        if document is None:
+            import requests
+            response = requests.get(DISCOVERY_URL, timeout=20)
+            response.raise_for_status()
+            document = response.text
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(document)
+        return document
+    
+    def _authenticate(self):
+        credentials = self._load_credentials()
+        if credentials and needs_refresh(credentials):
+            if credentials.refresh_token:
+                from google.auth.exceptions import RefreshError
+                from google.auth.transport.requests import Request
+                try:
+                    credentials.refresh(Request())
+                    self._save_credentials(credentials)
+                except RefreshError as e:
+                    log.warning("⚠️ No se pudo renovar el token de Google: %s", e)
+                    credentials = None
             else:
-                if not os.path.exists(GOOGLE_CREDENTIALS_FILE):
-                    print(f"❌ Error: No se encontró el archivo {GOOGLE_CREDENTIALS_FILE}")
-                    print("📋 Para obtener las credenciales:")
-                    print("1. Ve a https://console.developers.google.com/")
-                    print("2. Crea un nuevo proyecto o selecciona uno existente")
-                    print("3. Habilita la Google Calendar API")
-                    print("4. Crea credenciales OAuth 2.0")
-                    print("5. Descarga el archivo JSON y renómbralo como 'credentials.json'")
-                    return
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    GOOGLE_CREDENTIALS_FILE, SCOPES)
-                self.credentials = flow.run_local_server(port=0)
-            with open(GOOGLE_TOKEN_FILE, 'wb') as token:
-                pickle.dump(self.credentials, token)
+                credentials = None
+        if not credentials:
+            if not os.path.exists(GOOGLE_CREDENTIALS_FILE):
+                log.error("❌ Error: No se encontró el archivo %s\n"
+                          "📋 Para obtener las credenciales:\n"
+                          "1. Ve a https://console.developers.google.com/\n"
+                          "2. Crea un nuevo proyecto o selecciona uno existente\n"
+                          "3. Habilita la Google Calendar API\n"
+                          "4. Crea credenciales OAuth 2.0\n"
+                          "5. Descarga el archivo JSON y renómbralo como 'credentials.json'", GOOGLE_CREDENTIALS_FILE)
+                return
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            flow = InstalledAppFlow.from_client_secrets_file(
+                GOOGLE_CREDENTIALS_FILE, SCOPES)
+            credentials = flow.run_local_server(port=0)
+            self._save_credentials(credentials)
+        self.credentials = credentials
         try:
-            self.service = build('calendar', 'v3', credentials=self.credentials)
-            print("✅ Autenticación con Google Calendar exitosa")
+            from googleapiclient.discovery import build_from_document
+            self._service = build_from_document(self._discovery_document(), credentials=self.credentials)
+            log.info("✅ Autenticación con Google Calendar exitosa")
         except Exception as e:
-            print(f"❌ Error al conectar con Google Calendar: {e}")
+            log.error("❌ Error al conectar con Google Calendar: %s", e)
     
-    def create_event(self, title, start_date, description="", duration_hours=EVENT_DURATION_HOURS):
+    def new_http(self):
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        # httplib2 no es seguro entre hilos: cada escritor concurrente necesita su propia conexión
+        http = httplib2.Http()
+        if self.credentials:
+            return AuthorizedHttp(self.credentials, http=http)
+        return http
+    
+    def _build_event_body(self, title, start_date, description="", duration_hours=EVENT_DURATION_HOURS, properties=None):
+        end_date = start_date + timedelta(hours=duration_hours)
+        body = {
+            'summary': title,
+            'description': description,
+            'start': {
+                'dateTime': start_date.isoformat(),
+                'timeZone': AULES_TIMEZONE,
+            },
+            'end': {
+                'dateTime': end_date.isoformat(),
+                'timeZone': AULES_TIMEZONE,
+            },
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'email', 'minutes': 24 * 60},
+                    {'method': 'popup', 'minutes': 60},
+                ],
+            },
+        }
+        if properties:
+            body['extendedProperties'] = {'private': properties}
+        return body
+    
+    def create_event(self, title, start_date, description="", duration_hours=EVENT_DURATION_HOURS, properties=None):
         if not self.service:
-            print("❌ No se pudo conectar con Google Calendar")
+            log.error("❌ No se pudo conectar con Google Calendar")
             return None
         try:
-            end_date = start_date + timedelta(hours=duration_hours)
-            event = {
-                'summary': title,
-                'description': description,
-                'start': {
-                    'dateTime': start_date.isoformat(),
-                    'timeZone': 'Europe/Madrid',
-                },
-                'end': {
-                    'dateTime': end_date.isoformat(),
-                    'timeZone': 'Europe/Madrid',
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'email', 'minutes': 24 * 60},
-                        {'method': 'popup', 'minutes': 60},
-                    ],
-                },
-            }
-            event_result = self.service.events().insert(
+            event = self._build_event_body(title, start_date, description, duration_hours, properties)
+            event_result = execute_request(self.service.events().insert(
                 calendarId=CALENDAR_ID, 
                 body=event
-            ).execute()
+            ), 'insert')
             
-            print(f"✅ Evento creado: {title}")
-            print(f"   📅 Fecha: {start_date.strftime('%d/%m/%Y %H:%M')}")
-            print(f"   🔗 Enlace: {event_result.get('htmlLink')}")
+            if log.isEnabledFor(logging.INFO):
+                log.info("✅ Evento creado: %s\n   📅 Fecha: %s\n   🔗 Enlace: %s",
+                         title, start_date.strftime('%d/%m/%Y %H:%M'), event_result.get('htmlLink'))
             
             return event_result
             
         except HttpError as error:
-            print(f"❌ Error al crear evento: {error}")
+            log.error("❌ Error al crear evento: %s", error)
             return None
         except Exception as e:
-            print(f"❌ Error inesperado: {e}")
+            log.error("❌ Error inesperado: %s", e)
+            return None
+    
+    def _event_from_assignment(self, assignment):
+        # Los diccionarios de llamadas antiguas se convierten, incluida la fecha en texto
+        assignment = as_assignment(assignment)
+        nombre = assignment.nombre or 'Actividad sin nombre'
+        if not assignment.fecha:
+            log.warning("⚠️ Saltando actividad '%s': fecha no válida", nombre)
+            return None
+        title = f"📝 {nombre}"
+        description_parts = []
+        if assignment.curso:
+            description_parts.append(f"📚 Curso: {assignment.curso}")
+        if assignment.url:
+            description_parts.append(f"🔗 Enlace: {assignment.url}")
+        description_parts.append(f"\n📅 Fecha de entrega: {assignment.fecha_completa}")
+        if assignment.fecha_limite:
+            description_parts.append(f"⛔ Fecha límite: {format_fecha(assignment.fecha_limite)[2]}")
+        if assignment.estado_entrega:
+            description_parts.append(f"📤 Estado de la entrega: {assignment.estado_entrega}")
+        if assignment.descripcion:
+            description_parts.append(f"\n{assignment.descripcion}")
+        description = "\n".join(description_parts)
+        return title, assignment.fecha, description
+    
+    def event_body_for(self, assignment):
+        event_data = self._event_from_assignment(assignment)
+        if not event_data:
+            return None
+        return self._build_event_body(*event_data, properties=self._event_properties(assignment))
+    
+    def _event_properties(self, assignment):
+        if not assignment.get('id'):
             return None
+        return tag_properties(assignment['id'], assignment_hash(assignment))
+    
+    def known_events(self, state):
+        known = state.get_all()
+        if known or not self.service:
+            return known
+        # Sin estado local (equipo nuevo o base de datos perdida) se recupera desde las etiquetas del calendario
+        if self.remote_index is None:
+            self.remote_index = RemoteEventIndex(self.service)
+        try:
+            known = dict(self.remote_index.refresh())
+        except HttpError as error:
+            log.warning("⚠️ No se pudo leer el índice del calendario: %s", error)
+            return {}
+        for assignment_id, (event_id, content_hash) in known.items():
+            state.upsert(assignment_id, event_id, content_hash)
+        state.commit()
+        if known:
+            log.info("♻️ Estado local recuperado del calendario: %d eventos ya existentes", len(known))
+        return known
     
-    def create_events_from_assignments(self, assignments):
+    def create_events_from_assignments(self, assignments, use_batch=True):
+        if use_batch and self.service:
+            writer = CalendarBatchWriter(self.service)
+            titles = {}
+            for index, assignment in enumerate(assignments):
+                body = self.event_body_for(assignment)
+                if not body:
+                    continue
+                titles[index] = body['summary']
+                writer.insert(index, body)
+            results = writer.execute()
+            created_events = []
+            for index in sorted(results):
+                result = results[index]
+                if result.ok:
+                    log.info("✅ Evento creado: %s", titles[index])
+                    created_events.append(result.response)
+                else:
+                    log.error("❌ Error al crear evento '%s': %s", titles[index], result.error)
+            return created_events
+        
+        start = time.perf_counter()
         created_events = []
         for assignment in assignments:
-            nombre = assignment.get('nombre', 'Actividad sin nombre')
-            fecha_completa = assignment.get('fecha_completa', '')
-            curso = assignment.get('curso', '')
-            url = assignment.get('url', '')
-            fecha_timestamp = None
-            if fecha_completa and fecha_completa != "No encontrada":
-                try:
-                    fecha_timestamp = datetime.strptime(fecha_completa, '%d/%m/%Y %H:%M')
-                except ValueError:
-                    try:
-                        fecha_timestamp = datetime.strptime(fecha_completa, '%d/%m/%Y')
-                    except ValueError:
-                        print(f"⚠️ No se pudo parsear la fecha: {fecha_completa}")
-                        continue
-            if not fecha_timestamp:
-                print(f"⚠️ Saltando actividad '{nombre}': fecha no válida")
+            event_data = self._event_from_assignment(assignment)
+            if not event_data:
                 continue
-            title = f"📝 {nombre}"
-            description_parts = []
-            if curso:
-                description_parts.append(f"📚 Curso: {curso}")
-            if url:
-                description_parts.append(f"🔗 Enlace: {url}")
-            description_parts.append(f"\n📅 Fecha de entrega: {fecha_completa}")
-            description = "\n".join(description_parts)
-            event = self.create_event(title, fecha_timestamp, description)
+            event = self.create_event(*event_data, properties=self._event_properties(assignment))
             if event:
                 created_events.append(event)
+        elapsed = time.perf_counter() - start
+        log.info("⚡ %d eventos en %.2fs (%.1f eventos/s)", len(created_events), elapsed,
+                 len(created_events) / elapsed if elapsed else 0)
         
         return created_events
     
+    def sync_assignments(self, assignments, state, delete_removed=False, dry_run=False):
+        due_dates = state.due_dates() if delete_removed else None
+        plan = compute_plan(assignments, self.known_events(state), delete_removed, due_dates)
+        plan.log_plan()
+        summary = {'creados': 0, 'actualizados': 0, 'eliminados': 0, 'sin_cambios': len(plan.unchanged)}
+        if dry_run:
+            return summary
+        state.fill_due_dates(plan.unchanged)
+        state.commit()
+        if plan.is_empty():
+            return summary
+        writer = CalendarBatchWriter(self.service)
+        stored = {}
+        for assignment in plan.inserts:
+            body = self.event_body_for(assignment)
+            if body:
+                writer.insert(('creados', assignment['id']), body)
+                stored[assignment['id']] = assignment_hash(assignment), due_timestamp(assignment)
+        for assignment, event_id in plan.updates:
+            body = self.event_body_for(assignment)
+            if body:
+                writer.patch(('actualizados', assignment['id']), event_id, body)
+                stored[assignment['id']] = assignment_hash(assignment), due_timestamp(assignment)
+        for assignment_id, event_id in plan.deletes:
+            writer.delete(('eliminados', assignment_id), event_id)
+        results = writer.execute()
+        try:
+            for (action, assignment_id), result in results.items():
+                if not result.ok:
+                    log.error("❌ Error sincronizando la actividad %s: %s", assignment_id, result.error,
+                              extra={'actividad': assignment_id})
+                    continue
+                if action == 'eliminados':
+                    state.delete(assignment_id)
+                else:
+                    state.upsert(assignment_id, result.response['id'], *stored[assignment_id])
+                summary[action] += 1
+        finally:
+            state.commit()
+        return summary
+    
     def list_upcoming_events(self, max_results=10):
         if not self.service:
             print("❌ No se pudo conectar con Google Calendar")
@@ -129,13 +320,13 @@ class CalendarManager:
         try:
             now = datetime.utcnow().isoformat() + 'Z'
             
-            events_result = self.service.events().list(
+            events_result = execute_request(self.service.events().list(
                 calendarId=CALENDAR_ID,
                 timeMin=now,
                 maxResults=max_results,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
+            ), 'list')
             
             events = events_result.get('items', [])
             
@@ -0,0 +1,155 @@
+import argparse
+import os
+import subprocess
+import sys
+from config import SNAPSHOT_TTL_MINUTES, METRICS_PORT
+
+# Este módulo solo importa la biblioteca estándar: cada subcomando carga sus dependencias al ejecutarse
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+BENCHMARKS = {
+    'e2e': 'run_bench.py',
+    'html': 'bench_html_parsers.py',
+    'fechas': 'bench_date_parser.py',
+    'arranque': 'bench_calendar_startup.py',
+    'importacion': 'check_import_time.py',
+}
+
+
+def add_crawl_arguments(parser):
+    parser.add_argument('--cursos', action='store_true',
+                        help="Recorre todos los cursos para obtener todas las tareas con su fecha límite, estado y descripción")
+    parser.add_argument('--tiempos', nargs='?', const='-', metavar='FICHERO',
+                        help="Emite los tiempos de cada fase en JSON (por pantalla o en FICHERO)")
+    parser.add_argument('--reutilizar', type=int, metavar='MINUTOS', default=SNAPSHOT_TTL_MINUTES,
+                        help="Usa la última instantánea si tiene menos de MINUTOS minutos, sin conectar con Aules")
+    parser.add_argument('--sin-instantaneas', action='store_true',
+                        help="No guarda la cronología descargada en la caché de instantáneas")
+    add_observability_arguments(parser)
+
+
+def add_observability_arguments(parser):
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help="Solo muestra avisos y errores, sin una línea por entrega o evento")
+    parser.add_argument('--log-json', action='store_true',
+                        help="Emite los mensajes como líneas JSON con nivel, módulo y campos")
+    parser.add_argument('--metricas', nargs='?', const='-', metavar='FICHERO',
+                        help="Al terminar emite las métricas en JSON (por pantalla o en FICHERO; .prom para Prometheus)")
+    parser.add_argument('--metricas-puerto', type=int, default=METRICS_PORT, metavar='PUERTO',
+                        help="Sirve las métricas en formato Prometheus en http://127.0.0.1:PUERTO/metrics")
+
+
+def add_sync_arguments(parser):
+    add_crawl_arguments(parser)
+    # El modo vigilancia escribe en el calendario en cada consulta: no tiene simulación
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--dry-run', action='store_true',
+                      help="Muestra el plan de sincronización sin tocar Google Calendar")
+    mode.add_argument('--watch', action='store_true',
+                      help="Se queda en ejecución y sincroniza los cambios periódicamente")
+    parser.add_argument('--borrar-eliminadas', action='store_true',
+                        help="Elimina del calendario las entregas que ya no aparecen en Aules")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Escribe en el calendario a medida que llegan las entregas, sin esperar a tenerlas todas")
+    parser.add_argument('--yes', '-y', action='store_true',
+                        help="No pide confirmación antes de sincronizar con Google Calendar")
+
+
+def cmd_crawl(args):
+    from webcrawler import run_crawl
+    run_crawl(args)
+
+
+def cmd_sync(args):
+    from webcrawler import run_sync
+    run_sync(args)
+
+
+def cmd_list(args):
+    from calendar_manager import CalendarManager
+    CalendarManager().list_upcoming_events(args.max)
+
+
+def cmd_snapshots(args):
+    import contextlib
+    import io
+    import time
+    from snapshot_cache import SnapshotCache, diff_assignments, print_diff
+    cache = SnapshotCache()
+    try:
+        if args.accion == 'list':
+            for snapshot in cache.list(args.usuario):
+                fecha = time.strftime('%d/%m/%Y %H:%M', time.localtime(snapshot['fetched_at']))
+                print(f"#{snapshot['id']:<5} {fecha}  {snapshot['username']:<20} {snapshot['kind']:<5} "
+                      f"{len(snapshot['assignments']):>4} entregas  {snapshot['blob']}")
+            return 0
+        if args.accion == 'diff':
+            if len(args.ids) != 2:
+                print("❌ diff necesita dos instantáneas: cli.py snapshots diff ANTIGUA NUEVA")
+                return 2
+            old, new = cache.get(args.ids[0]), cache.get(args.ids[1])
+            if not old or not new:
+                print("❌ No existe alguna de las instantáneas indicadas")
+                return 2
+            print_diff(*diff_assignments(old['assignments'], new['assignments']))
+            return 0
+        from webcrawler import parse_snapshot
+        snapshots = [cache.get(i) for i in args.ids] if args.ids else cache.list(args.usuario)
+        errores = 0
+        for snapshot in filter(None, snapshots):
+            with contextlib.redirect_stdout(io.StringIO()):
+                assignments = parse_snapshot(snapshot['kind'], cache.content(snapshot), args.backend)
+            added, removed, changed = diff_assignments(snapshot['assignments'], assignments)
+            if added or removed or changed:
+                errores += 1
+                print(f"❌ #{snapshot['id']} ({snapshot['kind']}): el análisis actual no coincide con el guardado")
+                print_diff(added, removed, changed)
+            else:
+                print(f"✅ #{snapshot['id']} ({snapshot['kind']}): {len(assignments)} entregas, igual que al descargarla")
+        return 1 if errores else 0
+    finally:
+        cache.close()
+
+
+def cmd_bench(args):
+    script = os.path.join(BENCHMARKS_DIR, BENCHMARKS[args.nombre])
+    return subprocess.call([sys.executable, script, *args.argumentos])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Entregas de Aules en Google Calendar")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    crawl = subparsers.add_parser('crawl', help="Extrae las entregas de Aules y las muestra")
+    add_crawl_arguments(crawl)
+    crawl.add_argument('--json', action='store_true', help="Muestra las entregas en JSON")
+    crawl.set_defaults(func=cmd_crawl)
+
+    sync = subparsers.add_parser('sync', help="Extrae las entregas y las sincroniza con Google Calendar")
+    add_sync_arguments(sync)
+    sync.set_defaults(func=cmd_sync)
+
+    listing = subparsers.add_parser('list', help="Muestra los próximos eventos del calendario")
+    listing.add_argument('--max', type=int, default=10, help="Número máximo de eventos (por defecto 10)")
+    listing.set_defaults(func=cmd_list)
+
+    snapshots = subparsers.add_parser('snapshots', help="Consulta, reanaliza y compara las instantáneas de la cronología")
+    snapshots.add_argument('accion', choices=['list', 'replay', 'diff'])
+    snapshots.add_argument('ids', nargs='*', type=int, help="Instantáneas (replay: todas si se omite; diff: dos)")
+    snapshots.add_argument('--usuario', help="Solo las instantáneas de este usuario")
+    snapshots.add_argument('--backend', default='auto', help="Backend HTML para replay (auto, lxml, html.parser)")
+    snapshots.set_defaults(func=cmd_snapshots)
+
+    bench = subparsers.add_parser('bench', help="Ejecuta uno de los benchmarks de benchmarks/")
+    bench.add_argument('nombre', choices=sorted(BENCHMARKS))
+    bench.add_argument('argumentos', nargs=argparse.REMAINDER, help="Argumentos para el benchmark")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,58 @@ import os
 
 GOOGLE_CREDENTIALS_FILE = 'credentials.json'
 GOOGLE_TOKEN_FILE = 'token.json'
+GOOGLE_DISCOVERY_CACHE_FILE = 'calendar_v3_discovery.json'
+DISCOVERY_CACHE_MAX_AGE = 7 * 24 * 3600
+TOKEN_REFRESH_MARGIN = 300
 
 CALENDAR_ID = 'primary'
 EVENT_DURATION_HOURS = 1
+# Zona horaria de las fechas que muestra Aules y de los eventos del calendario
+AULES_TIMEZONE = 'Europe/Madrid'
 
+AULES_BASE_URL = os.getenv('AULES_BASE_URL', 'https://aules.edu.gva.es/fp')
+AULES_USE_SELENIUM = os.getenv('AULES_USE_SELENIUM', '0') == '1'
+# Mismo navegador para el motor HTTP y para Selenium
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+HTTP_POOL_SIZE = 10
+HTTP_TIMEOUT = 20
+TIMELINE_PAGE_SIZE = 50
+
+BATCH_MAX_WORKERS = 4
+BATCH_ACCOUNT_TIMEOUT = 120
+
+COOKIE_STORE_FILE = 'aules_cookies.json'
+BROWSER_POOL_SIZE = 2
+
+SYNC_STATE_FILE = 'aules_sync.db'
+
+CALENDAR_BATCH_SIZE = 50
+CALENDAR_MAX_RETRIES = 5
+CALENDAR_RETRY_BASE_DELAY = 1.0
+
+HTML_PARSER_BACKEND = os.getenv('AULES_HTML_PARSER', 'auto')
+HTML_SUBTREE_PARSE = True
+
+TIMELINE_WAIT_STRATEGY = os.getenv('AULES_WAIT_STRATEGY', 'dom')
+TIMELINE_WAIT_TIMEOUT = 20
+
+WATCH_MIN_INTERVAL = 300
+WATCH_MAX_INTERVAL = 3600
+WATCH_DUE_DIVISOR = 12
+WATCH_JITTER = 0.1
+
+COURSE_CRAWL_WORKERS = 8
+DESCRIPTION_MAX_CHARS = 2000
+HTTP_CACHE_FILE = 'aules_http_cache.db'
+
+PIPELINE_WRITERS = 4
+PIPELINE_QUEUE_SIZE = 100
+PIPELINE_WRITE_BATCH = 10
+
+SNAPSHOT_DIR = 'aules_snapshots'
+SNAPSHOT_MAX_COUNT = 200
+SNAPSHOT_TTL_MINUTES = int(os.getenv('AULES_SNAPSHOT_TTL', '0'))
+
+LOG_LEVEL = os.getenv('AULES_LOG_LEVEL', 'INFO').upper()
+METRICS_PORT = int(os.getenv('AULES_METRICS_PORT', '0'))
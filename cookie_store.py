@@ -0,0 +1,59 @@
+import json
+import os
+import threading
+import time
+from config import COOKIE_STORE_FILE
+
+SESSION_COOKIE = 'MoodleSession'
+
+
+class CookieStore:
+    def __init__(self, path=COOKIE_STORE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.logins_avoided = 0
+        self.full_logins = 0
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, data):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+    def load(self, username):
+        with self._lock:
+            return self._read().get(username)
+
+    def save(self, username, value, path='/'):
+        with self._lock:
+            data = self._read()
+            data[username] = {'value': value, 'path': path, 'guardada': int(time.time())}
+            self._write(data)
+
+    def forget(self, username):
+        with self._lock:
+            data = self._read()
+            if data.pop(username, None) is not None:
+                self._write(data)
+
+    def record_reused(self):
+        with self._lock:
+            self.logins_avoided += 1
+
+    def record_full_login(self):
+        with self._lock:
+            self.full_logins += 1
+
+    def stats(self):
+        with self._lock:
+            return {'logins_evitados': self.logins_avoided, 'logins_completos': self.full_logins}
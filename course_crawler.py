@@ -0,0 +1,175 @@
+import logging
+import re
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
+from aules_http import AulesSessionExpired
+from timeline_html import build_soup
+from date_parser import parse_date_text
+from assignment import Assignment
+from metrics import METRICS
+from config import COURSE_CRAWL_WORKERS, DESCRIPTION_MAX_CHARS, HTTP_TIMEOUT
+
+VIEW_HREF_RE = re.compile(r'view\.php\?id=(\d+)')
+STATUS_LABELS = ('submission status', 'estado de la entrega', 'estat de la tramesa', 'estat de la entrega')
+CUTOFF_LABELS = ('cut-off', 'cut off', 'fecha límite', 'data límit')
+DUE_LABELS = ('due', 'venciment', 'vencimiento', 'fecha de entrega', 'data de lliurament')
+
+log = logging.getLogger(__name__)
+
+
+def _label_kind(label):
+    label = label.strip().rstrip(':').lower()
+    for kind, keywords in (('estado', STATUS_LABELS), ('limite', CUTOFF_LABELS), ('vence', DUE_LABELS)):
+        if label.startswith(keywords):
+            return kind
+    return None
+
+
+def parse_course_index(html, page_url):
+    soup = build_soup(html, subtree=False)
+    entries = []
+    for row in soup.select('table.generaltable tbody tr'):
+        link = row.find('a', href=VIEW_HREF_RE)
+        if not link:
+            continue
+        fecha = None
+        for cell in row.find_all('td'):
+            if cell.find('a', href=VIEW_HREF_RE):
+                continue
+            fecha = parse_date_text(cell.get_text(' ', strip=True))
+            if fecha:
+                break
+        entries.append({
+            'id': VIEW_HREF_RE.search(link['href']).group(1),
+            'nombre': link.get_text(strip=True),
+            'fecha': fecha,
+            'url': urljoin(page_url, link['href']),
+        })
+    return entries
+
+
+def parse_assignment_page(html):
+    soup = build_soup(html, subtree=False)
+    details = {'fecha_limite': None, 'estado_entrega': None, 'descripcion': None, 'vence': None}
+    pairs = []
+    for item in soup.select("[data-region='activity-dates'] div"):
+        label = item.find('strong')
+        if label:
+            label_text = label.get_text(' ', strip=True)
+            value = item.get_text(' ', strip=True).replace(label_text, '', 1).strip()
+            pairs.append((label_text, value))
+    for row in soup.select('table.generaltable tr'):
+        header, value = row.find(['th', 'td']), row.find_all('td')
+        if header and value:
+            pairs.append((header.get_text(' ', strip=True), value[-1].get_text(' ', strip=True)))
+    for label, value in pairs:
+        kind = _label_kind(label)
+        if kind == 'estado' and not details['estado_entrega']:
+            details['estado_entrega'] = value
+        elif kind == 'limite' and not details['fecha_limite']:
+            details['fecha_limite'] = parse_date_text(value)
+        elif kind == 'vence' and not details['vence']:
+            details['vence'] = parse_date_text(value)
+    intro = soup.select_one('.activity-description') or soup.find(id='intro')
+    if intro:
+        descripcion = intro.get_text('\n', strip=True)
+        details['descripcion'] = descripcion[:DESCRIPTION_MAX_CHARS] or None
+    return details
+
+
+class CourseAssignmentCrawler:
+    def __init__(self, http_client, cache=None, max_workers=COURSE_CRAWL_WORKERS):
+        self.http_client = http_client
+        self.base_url = http_client.base_url
+        self.cache = cache
+        self.max_workers = max_workers
+
+    def _get(self, url):
+        if self.cache:
+            html, final_url = self.cache.get(self.http_client.session, url)
+        else:
+            response = self.http_client.session.get(url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            html, final_url = response.text, response.url
+        if '/login/' in final_url:
+            raise AulesSessionExpired("Aules ha redirigido a la página de login")
+        return html
+
+    def list_courses(self):
+        data = self.http_client.call_ajax('core_course_get_enrolled_courses_by_timeline_classification', {
+            'offset': 0,
+            'limit': 0,
+            'classification': 'all',
+            'sort': 'fullname',
+        })
+        return (data or {}).get('courses', [])
+
+    def _fetch_index(self, course):
+        url = f"{self.base_url}/mod/assign/index.php?id={course['id']}"
+        return course, parse_course_index(self._get(url), url)
+
+    def _fetch_details(self, entry):
+        return entry, parse_assignment_page(self._get(entry['url']))
+
+    def crawl(self):
+        courses = self.list_courses()
+        log.info("📚 Cursos matriculados: %d", len(courses))
+        found = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            index_futures = [executor.submit(self._fetch_index, course) for course in courses]
+            detail_futures = []
+            for future in as_completed(index_futures):
+                try:
+                    course, entries = future.result()
+                except AulesSessionExpired:
+                    raise
+                except Exception as e:
+                    log.warning("⚠️ Error obteniendo las tareas de un curso: %s", e)
+                    continue
+                for entry in entries:
+                    entry['curso'] = course.get('fullnamedisplay') or course.get('fullname')
+                    found[entry['id']] = entry
+                    detail_futures.append(executor.submit(self._fetch_details, entry))
+            for future in as_completed(detail_futures):
+                try:
+                    entry, details = future.result()
+                except AulesSessionExpired:
+                    raise
+                except Exception as e:
+                    log.warning("⚠️ Error obteniendo el detalle de una tarea: %s", e)
+                    continue
+                entry.update(details)
+        METRICS.inc('aules_entregas_analizadas_total', len(found), origen='cursos')
+        log.info("📝 Tareas encontradas en los cursos: %d", len(found))
+        return found
+
+
+def merge_course_assignments(assignments, course_entries):
+    merged = []
+    seen = set()
+    for assignment in assignments:
+        entry = course_entries.get(assignment.id)
+        if entry:
+            assignment = replace(
+                assignment,
+                fecha_limite=entry.get('fecha_limite'),
+                estado_entrega=entry.get('estado_entrega'),
+                descripcion=entry.get('descripcion'),
+            )
+        merged.append(assignment)
+        seen.add(assignment.id)
+    for assignment_id, entry in course_entries.items():
+        if assignment_id in seen:
+            continue
+        merged.append(Assignment(
+            id=assignment_id,
+            nombre=entry['nombre'],
+            fecha=entry.get('vence') or entry.get('fecha'),
+            curso=entry.get('curso'),
+            url=entry['url'],
+            fecha_limite=entry.get('fecha_limite'),
+            estado_entrega=entry.get('estado_entrega'),
+            descripcion=entry.get('descripcion'),
+        ))
+    return merged
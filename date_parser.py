@@ -0,0 +1,101 @@
+import re
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from config import AULES_TIMEZONE
+
+AULES_TZ = ZoneInfo(AULES_TIMEZONE)
+
+MESES = {
+    # es
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
+    'julio': 7, 'agosto': 8, 'septiembre': 9, 'setiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12,
+    # ca-va
+    'gener': 1, 'febrer': 2, 'març': 3, 'marc': 3, 'maig': 5, 'juny': 6,
+    'juliol': 7, 'agost': 8, 'setembre': 9, 'novembre': 11, 'desembre': 12,
+    # en
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+}
+
+DATE_RE = re.compile(
+    r"\b(?P<dia>\d{1,2})\s+(?:de\s+|d['’]\s*)?(?P<mes>[^\W\d_]+)\.?(?:\s+de)?\s+(?P<anyo>\d{4})\b"
+    r"(?:,?\s+(?:a\s+las\s+|a\s+les\s+|at\s+)?(?P<hora>\d{1,2})[:.](?P<minuto>\d{2})"
+    r"(?:\s*(?P<ampm>[AaPp])\.?\s*[Mm]\.?)?)?",
+    re.IGNORECASE
+)
+DUE_KEYWORDS = ('vencerà el ', 'vencera el ', 'vence el ', 'is due on ', 'is due ')
+TIME_RE = re.compile(r'\b(\d{1,2}):(\d{2})\b')
+
+
+def _build(match, hora=None, minuto=None):
+    dia = int(match.group('dia'))
+    mes = MESES.get(match.group('mes').lower())
+    if not mes:
+        return None
+    anyo = int(match.group('anyo'))
+    if match.group('hora') is not None:
+        hora = int(match.group('hora'))
+        minuto = int(match.group('minuto'))
+        ampm = match.group('ampm')
+        if ampm:
+            ampm = ampm.upper()
+            if ampm == 'P' and hora != 12:
+                hora += 12
+            elif ampm == 'A' and hora == 12:
+                hora = 0
+    try:
+        return datetime(anyo, mes, dia, hora or 0, minuto or 0)
+    except ValueError:
+        return None
+
+
+def parse_due_label(label):
+    if not label:
+        return None
+    lower = label.lower()
+    for keyword in DUE_KEYWORDS:
+        position = lower.find(keyword)
+        if position != -1:
+            break
+    else:
+        return None
+    start = position + len(keyword)
+    match = DATE_RE.match(label, start)
+    if match:
+        fecha = _build(match)
+        if fecha:
+            return fecha
+    for match in DATE_RE.finditer(label, start):
+        fecha = _build(match)
+        if fecha:
+            return fecha
+    return None
+
+
+def parse_date_text(text):
+    if not text:
+        return None
+    for match in DATE_RE.finditer(text):
+        if match.group('mes').lower() not in MESES:
+            continue
+        if match.group('hora') is None:
+            time_match = TIME_RE.search(text)
+            if time_match:
+                return _build(match, int(time_match.group(1)), int(time_match.group(2)))
+        return _build(match)
+    return None
+
+
+def parse_timestamp(value):
+    try:
+        return datetime.fromtimestamp(int(value), AULES_TZ)
+    except (TypeError, ValueError, OSError, OverflowError):
+        return None
+
+
+def format_fecha(fecha):
+    if not fecha:
+        return "No encontrada", "No encontrada", "No encontrada"
+    fecha_entrega = f"{fecha.day:02d}/{fecha.month:02d}/{fecha.year:04d}"
+    hora = f"{fecha.hour:02d}:{fecha.minute:02d}"
+    return fecha_entrega, hora, f"{fecha_entrega} {hora}"
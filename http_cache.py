@@ -0,0 +1,56 @@
+import sqlite3
+import threading
+import time
+from config import HTTP_CACHE_FILE, HTTP_TIMEOUT
+
+
+class HttpCache:
+    def __init__(self, path=HTTP_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, "
+            "etag TEXT, "
+            "last_modified TEXT, "
+            "body TEXT NOT NULL, "
+            "fetched_at INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+
+    def _lookup(self, url):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT etag, last_modified, body FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _store(self, url, etag, last_modified, body):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, int(time.time()))
+            )
+            self.conn.commit()
+
+    def get(self, session, url):
+        cached = self._lookup(url)
+        headers = {}
+        if cached:
+            if cached[0]:
+                headers['If-None-Match'] = cached[0]
+            if cached[1]:
+                headers['If-Modified-Since'] = cached[1]
+        response = session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return cached[2], response.url
+        response.raise_for_status()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._store(url, etag, last_modified, response.text)
+        return response.text, response.url
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,34 @@
+import json
+import logging
+import sys
+from config import LOG_LEVEL
+
+# Atributos propios de LogRecord: todo lo demás llega por extra= y se emite como campo estructurado
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': round(record.created, 3),
+            'nivel': record.levelname,
+            'modulo': record.name,
+            'mensaje': record.getMessage(),
+        }
+        data.update({key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES})
+        if record.exc_info:
+            data['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def setup_logging(quiet=False, json_format=False, level=LOG_LEVEL, stream=None):
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter('%(message)s'))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    # En modo silencioso los mensajes por entrega ni siquiera se formatean
+    root.setLevel(logging.WARNING if quiet else level)
+    for noisy in ('googleapiclient', 'urllib3', 'selenium', 'WDM'):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
@@ -0,0 +1,145 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            histogram['counts'][bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    @contextmanager
+    def timed(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_dict(self):
+        with self.lock:
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({'etiquetas': dict(labels), 'valor': value})
+            histograms = {}
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                histograms.setdefault(name, []).append({
+                    'etiquetas': dict(labels),
+                    'cuenta': histogram['count'],
+                    'suma': round(histogram['sum'], 4),
+                    'media': round(histogram['sum'] / histogram['count'], 4),
+                    'cubetas': dict(zip([*map(str, self.buckets), '+Inf'], histogram['counts'])),
+                })
+        return {'contadores': counters, 'histogramas': histograms}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        lines = []
+        with self.lock:
+            described = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in described:
+                    described.add(name)
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{_label_text(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in described:
+                    described.add(name)
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip([*map(str, self.buckets), '+Inf'], histogram['counts']):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_label_text((*labels, ('le', bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(labels)} {histogram['sum']:.6f}")
+                lines.append(f"{name}_count{_label_text(labels)} {histogram['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, destination, stream=None):
+        if destination == '-':
+            print(self.to_json(), file=stream)
+            return
+        content = self.to_prometheus() if destination.endswith('.prom') else self.to_json()
+        with open(destination, 'w', encoding='utf-8') as f:
+            f.write(content)
+        log.info("📈 Métricas guardadas en %s", destination)
+
+    def serve(self, port, host='127.0.0.1'):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        log.info("📈 Métricas Prometheus en http://%s:%d/metrics", host, server.server_port)
+        return server
+
+
+METRICS = Metrics()
+METRICS.describe('aules_logins_total', "Inicios de sesión en Aules por motor y resultado")
+METRICS.describe('aules_login_segundos', "Duración del inicio de sesión en Aules")
+METRICS.describe('aules_entregas_analizadas_total', "Entregas extraídas por origen")
+METRICS.describe('aules_fecha_rama_total', "Intentos de obtener la fecha de una entrega por rama y resultado")
+METRICS.describe('aules_errores_analisis_total', "Elementos de la cronología que no se pudieron analizar")
+METRICS.describe('calendar_llamadas_total', "Operaciones enviadas a Google Calendar por tipo y resultado")
+METRICS.describe('calendar_llamada_segundos', "Latencia de las peticiones a Google Calendar")
+METRICS.describe('calendar_reintentos_total', "Operaciones de Google Calendar reintentadas")
@@ -0,0 +1,52 @@
+import logging
+from calendar_batch import execute_request
+from config import CALENDAR_ID
+
+ORIGIN_PROPERTY = 'aules_origen'
+ORIGIN_VALUE = 'webcrawler'
+ID_PROPERTY = 'aules_id'
+HASH_PROPERTY = 'aules_hash'
+LIST_FIELDS = 'nextPageToken,items(id,extendedProperties/private)'
+LIST_PAGE_SIZE = 2500
+
+log = logging.getLogger(__name__)
+
+
+def tag_properties(assignment_id, content_hash):
+    return {ORIGIN_PROPERTY: ORIGIN_VALUE, ID_PROPERTY: str(assignment_id), HASH_PROPERTY: content_hash}
+
+
+class RemoteEventIndex:
+    def __init__(self, service, calendar_id=CALENDAR_ID):
+        self.service = service
+        self.calendar_id = calendar_id
+        self.entries = {}
+
+    def _apply(self, entries, item):
+        private = (item.get('extendedProperties') or {}).get('private') or {}
+        if private.get(ORIGIN_PROPERTY) == ORIGIN_VALUE and private.get(ID_PROPERTY):
+            entries[private[ID_PROPERTY]] = (item['id'], private.get(HASH_PROPERTY, ''))
+
+    def refresh(self):
+        # Siempre es un recorrido completo: la API no admite syncToken junto a privateExtendedProperty,
+        # y solo hace falta cuando se ha perdido el estado local
+        entries = {}
+        page_token = None
+        pages = 0
+        while True:
+            response = execute_request(self.service.events().list(
+                calendarId=self.calendar_id,
+                privateExtendedProperty=f"{ORIGIN_PROPERTY}={ORIGIN_VALUE}",
+                maxResults=LIST_PAGE_SIZE,
+                pageToken=page_token,
+                fields=LIST_FIELDS,
+            ), 'list')
+            pages += 1
+            for item in response.get('items', []):
+                self._apply(entries, item)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        self.entries = entries
+        log.info("📇 Índice del calendario reconstruido: %d eventos de Aules (%d páginas)", len(entries), pages)
+        return entries
@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+from assignment import STORAGE_FORMAT, dumps_assignments, loads_assignments
+from config import SNAPSHOT_DIR, SNAPSHOT_MAX_COUNT
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPARED_FIELDS = ('nombre', 'fecha_completa', 'curso', 'url', 'fecha_limite', 'estado_entrega', 'descripcion')
+
+
+def _compress(raw):
+    if zstandard is not None:
+        return '.zst', zstandard.ZstdCompressor(level=10).compress(raw)
+    return '.gz', gzip.compress(raw, compresslevel=9)
+
+
+def _decompress(path, data):
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"La instantánea {os.path.basename(path)} está comprimida con zstd y falta el paquete zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def diff_assignments(old, new):
+    old_by_id = {a.id: a for a in old}
+    new_by_id = {a.id: a for a in new}
+    added = [new_by_id[i] for i in new_by_id if i not in old_by_id]
+    removed = [old_by_id[i] for i in old_by_id if i not in new_by_id]
+    changed = []
+    for assignment_id, assignment in new_by_id.items():
+        previous = old_by_id.get(assignment_id)
+        if previous is None or previous.content_hash == assignment.content_hash:
+            continue
+        fields = [field for field in COMPARED_FIELDS if previous.get(field) != assignment.get(field)]
+        if fields:
+            changed.append((previous, assignment, fields))
+    return added, removed, changed
+
+
+def print_diff(added, removed, changed):
+    if not (added or removed or changed):
+        print("✅ Sin diferencias")
+        return
+    print(f"🧮 {len(added)} nuevas, {len(removed)} desaparecidas, {len(changed)} modificadas")
+    for assignment in added:
+        print(f"   ➕ {assignment.nombre} - 📅 {assignment.fecha_completa}")
+    for assignment in removed:
+        print(f"   ➖ {assignment.nombre} - 📅 {assignment.fecha_completa}")
+    for previous, assignment, fields in changed:
+        print(f"   ✏️ {assignment.nombre}")
+        for field in fields:
+            print(f"      {field}: {previous.get(field)!r} → {assignment.get(field)!r}")
+
+
+class SnapshotCache:
+    def __init__(self, directory=SNAPSHOT_DIR, max_count=SNAPSHOT_MAX_COUNT):
+        self.directory = directory
+        self.max_count = max_count
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.db'), timeout=30)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "username TEXT NOT NULL, "
+            "kind TEXT NOT NULL, "
+            "blob TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, "
+            "assignments BLOB NOT NULL, "
+            "format TEXT NOT NULL DEFAULT 'json')"
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(snapshots)")}
+        if 'format' not in columns:
+            self.conn.execute("ALTER TABLE snapshots ADD COLUMN format TEXT NOT NULL DEFAULT 'json'")
+        self.conn.commit()
+
+    def _blob_path(self, digest):
+        prefix = os.path.join(self.directory, 'objects', digest[:2], digest)
+        for ext in ('.zst', '.gz'):
+            if os.path.exists(prefix + ext):
+                return prefix + ext
+        return None
+
+    def _write_blob(self, raw):
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(digest)
+        if path:
+            os.utime(path)
+            return os.path.relpath(path, self.directory)
+        ext, data = _compress(raw)
+        path = os.path.join(self.directory, 'objects', digest[:2], digest + ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return os.path.relpath(path, self.directory)
+
+    def store(self, username, kind, content, assignments):
+        blob = self._write_blob(content.encode('utf-8'))
+        cursor = self.conn.execute(
+            "INSERT INTO snapshots (username, kind, blob, fetched_at, assignments, format) VALUES (?, ?, ?, ?, ?, ?)",
+            (username, kind, blob, time.time(), dumps_assignments(assignments, STORAGE_FORMAT), STORAGE_FORMAT)
+        )
+        self.conn.commit()
+        self._prune()
+        return cursor.lastrowid
+
+    def _row(self, row):
+        if row is None:
+            return None
+        snapshot_id, username, kind, blob, fetched_at, assignments, fmt = row
+        return {
+            'id': snapshot_id,
+            'username': username,
+            'kind': kind,
+            'blob': blob,
+            'fetched_at': fetched_at,
+            'assignments': loads_assignments(assignments, fmt),
+        }
+
+    def get(self, snapshot_id):
+        return self._row(self.conn.execute(
+            "SELECT id, username, kind, blob, fetched_at, assignments, format FROM snapshots WHERE id = ?", (snapshot_id,)
+        ).fetchone())
+
+    def latest(self, username, max_age=None):
+        query = "SELECT id, username, kind, blob, fetched_at, assignments, format FROM snapshots WHERE username = ?"
+        params = [username]
+        if max_age is not None:
+            query += " AND fetched_at >= ?"
+            params.append(time.time() - max_age)
+        return self._row(self.conn.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone())
+
+    def list(self, username=None):
+        query = "SELECT id, username, kind, blob, fetched_at, assignments, format FROM snapshots"
+        params = []
+        if username:
+            query += " WHERE username = ?"
+            params.append(username)
+        return [self._row(row) for row in self.conn.execute(query + " ORDER BY id", params)]
+
+    def content(self, snapshot):
+        path = os.path.join(self.directory, snapshot['blob'])
+        with open(path, 'rb') as f:
+            return _decompress(path, f.read()).decode('utf-8')
+
+    def _prune(self):
+        if not self.max_count:
+            return
+        deleted = self.conn.execute(
+            "DELETE FROM snapshots WHERE id NOT IN (SELECT id FROM snapshots ORDER BY id DESC LIMIT ?)",
+            (self.max_count,)
+        ).rowcount
+        self.conn.commit()
+        if not deleted:
+            return
+        # Los ficheros recientes pueden pertenecer a otro proceso que aún no ha registrado su instantánea
+        recent = time.time() - 60
+        referenced = {row[0] for row in self.conn.execute("SELECT DISTINCT blob FROM snapshots")}
+        objects_dir = os.path.join(self.directory, 'objects')
+        for prefix in os.listdir(objects_dir):
+            for name in os.listdir(os.path.join(objects_dir, prefix)):
+                blob = os.path.join('objects', prefix, name)
+                path = os.path.join(self.directory, blob)
+                if blob not in referenced and not name.endswith('.tmp') and os.path.getmtime(path) < recent:
+                    os.remove(path)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,127 @@
+import logging
+import sqlite3
+import time
+from assignment import as_assignment
+from config import SYNC_STATE_FILE
+
+log = logging.getLogger(__name__)
+
+
+def assignment_hash(assignment):
+    return as_assignment(assignment).content_hash
+
+
+def due_timestamp(assignment):
+    fecha = as_assignment(assignment).fecha
+    return int(fecha.timestamp()) if fecha else None
+
+
+class SyncState:
+    def __init__(self, path=SYNC_STATE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS assignments ("
+            "assignment_id TEXT PRIMARY KEY, "
+            "event_id TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, "
+            "updated_at INTEGER NOT NULL, "
+            "due_at INTEGER)"
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(assignments)")}
+        if 'due_at' not in columns:
+            self.conn.execute("ALTER TABLE assignments ADD COLUMN due_at INTEGER")
+        self.conn.commit()
+
+    def get_all(self):
+        rows = self.conn.execute("SELECT assignment_id, event_id, content_hash FROM assignments")
+        return {assignment_id: (event_id, content_hash) for assignment_id, event_id, content_hash in rows}
+
+    def due_dates(self):
+        return dict(self.conn.execute("SELECT assignment_id, due_at FROM assignments WHERE due_at IS NOT NULL"))
+
+    def upsert(self, assignment_id, event_id, content_hash, due_at=None):
+        self.conn.execute(
+            "INSERT INTO assignments (assignment_id, event_id, content_hash, updated_at, due_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(assignment_id) DO UPDATE SET event_id = excluded.event_id, "
+            "content_hash = excluded.content_hash, updated_at = excluded.updated_at, "
+            "due_at = COALESCE(excluded.due_at, assignments.due_at)",
+            (assignment_id, event_id, content_hash, int(time.time()), due_at)
+        )
+
+    def fill_due_dates(self, assignments):
+        # Las filas guardadas antes de existir due_at (o recuperadas del calendario) la reciben al verse de nuevo
+        rows = [(due_timestamp(assignment), assignment['id']) for assignment in assignments]
+        self.conn.executemany("UPDATE assignments SET due_at = ? WHERE assignment_id = ? AND due_at IS NULL",
+                              [row for row in rows if row[0] is not None])
+
+    def delete(self, assignment_id):
+        self.conn.execute("DELETE FROM assignments WHERE assignment_id = ?", (assignment_id,))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class SyncPlan:
+    def __init__(self):
+        self.inserts = []
+        self.updates = []
+        self.deletes = []
+        self.unchanged = []
+
+    def is_empty(self):
+        return not (self.inserts or self.updates or self.deletes)
+
+    def log_plan(self):
+        # En modo silencioso no se formatea nada: en --watch se calcula un plan en cada consulta
+        if not log.isEnabledFor(logging.INFO):
+            return
+        log.info("🧮 Plan de sincronización: %d nuevas, %d modificadas, %d eliminadas, %d sin cambios",
+                 len(self.inserts), len(self.updates), len(self.deletes), len(self.unchanged))
+        for assignment in self.inserts:
+            log.info("   ➕ %s - 📅 %s", assignment['nombre'], assignment['fecha_completa'])
+        for assignment, _ in self.updates:
+            log.info("   ✏️ %s - 📅 %s", assignment['nombre'], assignment['fecha_completa'])
+        for assignment_id, _ in self.deletes:
+            log.info("   🗑️ Actividad %s", assignment_id)
+
+
+def classify_assignment(assignment, known):
+    stored = known.get(assignment['id'])
+    if stored is None:
+        return 'insert', None
+    if stored[1] != assignment_hash(assignment):
+        return 'update', stored[0]
+    return 'unchanged', stored[0]
+
+
+def removed_assignments(known, seen, due_dates, now=None):
+    # Aules solo devuelve las entregas pendientes desde hoy: las vencidas y las ya entregadas también
+    # desaparecen. Solo se borra lo que, según la fecha guardada, todavía no había vencido.
+    now = time.time() if now is None else now
+    return [(assignment_id, event_id) for assignment_id, (event_id, _) in known.items()
+            if assignment_id not in seen and due_dates.get(assignment_id, 0) > now]
+
+
+def compute_plan(assignments, known, delete_removed=False, due_dates=None):
+    plan = SyncPlan()
+    seen = set()
+    for assignment in assignments:
+        assignment_id = assignment.get('id')
+        if not assignment_id or assignment_id in seen:
+            continue
+        seen.add(assignment_id)
+        action, event_id = classify_assignment(assignment, known)
+        if action == 'insert':
+            plan.inserts.append(assignment)
+        elif action == 'update':
+            plan.updates.append((assignment, event_id))
+        else:
+            plan.unchanged.append(assignment)
+    if delete_removed:
+        plan.deletes = removed_assignments(known, seen, due_dates or {})
+    return plan
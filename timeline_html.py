@@ -0,0 +1,68 @@
+import re
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+EVENT_LIST_SELECTOR = "[data-region='event-list-content']"
+EVENT_LIST_OPEN_RE = re.compile(r'<div\b[^>]*\bdata-region\s*=\s*["\']event-list-content["\'][^>]*>', re.IGNORECASE)
+DIV_TAG_RE = re.compile(r'<(/?)div\b', re.IGNORECASE)
+
+
+def available_backends():
+    return ['lxml', 'html.parser'] if HAS_LXML else ['html.parser']
+
+
+def available_extractors():
+    return ['selectolax', 'regex'] if SelectolaxParser is not None else ['regex']
+
+
+def resolve_backend(backend='auto'):
+    if backend == 'auto':
+        return available_backends()[0]
+    if backend not in available_backends():
+        raise ValueError(f"Backend de HTML no disponible: {backend} (disponibles: {', '.join(available_backends())})")
+    return backend
+
+
+def _scan_event_list(html):
+    match = EVENT_LIST_OPEN_RE.search(html)
+    if not match:
+        return None
+    depth = 1
+    for tag in DIV_TAG_RE.finditer(html, match.end()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            end = html.find('>', tag.end())
+            return html[match.start():end + 1] if end != -1 else None
+    return None
+
+
+def extract_event_list(html, extractor='auto'):
+    # selectolax solo recorta el subárbol: el árbol que se recorre siempre es de BeautifulSoup
+    if extractor == 'auto':
+        extractor = available_extractors()[0]
+    if extractor == 'selectolax':
+        node = SelectolaxParser(html).css_first(EVENT_LIST_SELECTOR)
+        return node.html if node is not None else None
+    return _scan_event_list(html)
+
+
+def build_soup(html, backend='auto', subtree=True, extractor='auto'):
+    backend = resolve_backend(backend)
+    if subtree:
+        fragment = extract_event_list(html, extractor)
+        if fragment is not None:
+            html = fragment
+    return BeautifulSoup(html, backend)
@@ -0,0 +1,61 @@
+import json
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+
+TIMELINE_AJAX_METHOD = 'core_calendar_get_action_events_by_timesort'
+PLACEHOLDER_SELECTOR = "[data-region='event-list-loading-placeholder']"
+EMPTY_SELECTOR = "[data-region='no-events-empty-message']"
+ITEM_SELECTOR = "[data-region='event-list-content'] .list-group-item"
+
+
+class TimelineSettled:
+    def __init__(self, stable_polls=2):
+        self.stable_polls = stable_polls
+        self.last_count = None
+        self.stable = 0
+
+    def __call__(self, driver):
+        try:
+            if any(p.is_displayed() for p in driver.find_elements(By.CSS_SELECTOR, PLACEHOLDER_SELECTOR)):
+                self.last_count = None
+                self.stable = 0
+                return False
+            if any(e.is_displayed() for e in driver.find_elements(By.CSS_SELECTOR, EMPTY_SELECTOR)):
+                return True
+            count = len(driver.find_elements(By.CSS_SELECTOR, ITEM_SELECTOR))
+        except StaleElementReferenceException:
+            return False
+        if count and count == self.last_count:
+            self.stable += 1
+        else:
+            self.stable = 0
+        self.last_count = count
+        return self.stable >= self.stable_polls
+
+
+class TimelineAjaxFinished:
+    def __init__(self):
+        self.request_ids = set()
+
+    def __call__(self, driver):
+        for entry in driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            params = message.get('params', {})
+            if message.get('method') == 'Network.requestWillBeSent':
+                if TIMELINE_AJAX_METHOD in params.get('request', {}).get('url', ''):
+                    self.request_ids.add(params.get('requestId'))
+            elif message.get('method') == 'Network.loadingFinished':
+                if params.get('requestId') in self.request_ids:
+                    return True
+        return False
+
+
+def performance_logs_available(driver):
+    try:
+        driver.get_log('performance')
+        return True
+    except WebDriverException:
+        return False
@@ -0,0 +1,32 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = []
+        self.marks = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({'fase': name, 'segundos': round(time.perf_counter() - start, 4)})
+
+    def mark(self, name, seconds):
+        self.marks[name] = round(seconds, 4)
+
+    def total(self):
+        return round(sum(phase['segundos'] for phase in self.phases), 4)
+
+    def to_dict(self):
+        data = {'fases': list(self.phases), 'total_segundos': self.total()}
+        if self.marks:
+            data['hitos'] = dict(self.marks)
+        return data
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
@@ -0,0 +1,79 @@
+import logging
+import random
+import signal
+import threading
+from datetime import datetime
+from timings import PhaseTimer
+from date_parser import AULES_TZ
+from config import WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL, WATCH_DUE_DIVISOR, WATCH_JITTER
+
+log = logging.getLogger(__name__)
+
+
+def with_jitter(seconds, jitter=WATCH_JITTER):
+    return seconds * random.uniform(1 - jitter, 1 + jitter)
+
+
+def adaptive_interval(assignments, now=None, min_interval=WATCH_MIN_INTERVAL, max_interval=WATCH_MAX_INTERVAL):
+    now = now or datetime.now(AULES_TZ)
+    pending = [a['fecha'] for a in assignments if a.get('fecha') and a['fecha'] > now]
+    if not pending:
+        return max_interval
+    seconds_to_due = (min(pending) - now).total_seconds()
+    return max(min_interval, min(max_interval, seconds_to_due / WATCH_DUE_DIVISOR))
+
+
+class AssignmentWatcher:
+    def __init__(self, crawler, calendar, state, delete_removed=False,
+                 min_interval=WATCH_MIN_INTERVAL, max_interval=WATCH_MAX_INTERVAL):
+        self.crawler = crawler
+        self.calendar = calendar
+        self.state = state
+        self.delete_removed = delete_removed
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.stop_event = threading.Event()
+        self.failures = 0
+
+    def _handle_signal(self, signum, frame):
+        print(f"\n🛑 Señal {signal.Signals(signum).name} recibida, cerrando el modo vigilancia...")
+        self.stop_event.set()
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+    def poll_once(self):
+        self.crawler.timer = PhaseTimer()
+        assignments = self.crawler.poll_assignments()
+        with self.crawler.timer.phase('sincronizacion_calendario'):
+            summary = self.calendar.sync_assignments(assignments, self.state, delete_removed=self.delete_removed)
+        if summary['creados'] or summary['actualizados'] or summary['eliminados']:
+            log.info("🔔 Cambios en Aules: %d nuevas, %d modificadas, %d eliminadas",
+                     summary['creados'], summary['actualizados'], summary['eliminados'])
+        return assignments
+
+    def next_delay(self, assignments):
+        if self.failures:
+            return with_jitter(min(self.max_interval, self.min_interval * (2 ** (self.failures - 1))))
+        return with_jitter(adaptive_interval(assignments, min_interval=self.min_interval, max_interval=self.max_interval))
+
+    def run(self):
+        self.install_signal_handlers()
+        print(f"👀 Modo vigilancia activo (intervalo entre {self.min_interval}s y {self.max_interval}s)")
+        assignments = []
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    assignments = self.poll_once()
+                    self.failures = 0
+                except Exception as e:
+                    self.failures += 1
+                    log.warning("⚠️ Error consultando Aules (%d seguidos): %s", self.failures, e)
+                delay = self.next_delay(assignments)
+                log.info("💤 Próxima consulta en %.1f minutos", delay / 60)
+                self.stop_event.wait(delay)
+        finally:
+            self.crawler.close()
+            self.state.close()
+            print("🔒 Modo vigilancia detenido")
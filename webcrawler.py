@@ -1,45 +1,141 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import json
+import logging
 import re
-from datetime import datetime
-import time
 import os
+import sys
+import threading
+import time
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-from calendar_manager import CalendarManager
+from aules_http import AulesHttpClient, AulesSessionExpired, assignments_from_events
+from cookie_store import CookieStore
+from sync_state import SyncState, compute_plan
+from timings import PhaseTimer
+from date_parser import parse_due_label, parse_timestamp, parse_date_text
+from assignment import Assignment
+from metrics import METRICS
+from config import (AULES_BASE_URL, AULES_USE_SELENIUM, HTML_PARSER_BACKEND, HTML_SUBTREE_PARSE,
+                    TIMELINE_WAIT_STRATEGY, TIMELINE_WAIT_TIMEOUT)
 
 load_dotenv()
 
+ASSIGN_HREF_RE = re.compile(r'/mod/assign/')
+ASSIGN_ID_RE = re.compile(r'id=(\d+)')
+_LOOKUP = object()
+
+log = logging.getLogger(__name__)
+
 class AulesTimelineCrawler:
-    def __init__(self, username, password):
-        self.base_url = "https://aules.edu.gva.es/fp"
+    def __init__(self, username, password, use_selenium=AULES_USE_SELENIUM, browser_pool=None, cookie_store=None,
+                 parser_backend=HTML_PARSER_BACKEND, subtree_parse=HTML_SUBTREE_PARSE,
+                 wait_strategy=TIMELINE_WAIT_STRATEGY, include_courses=False, snapshots=None, snapshot_ttl=0):
+        self.base_url = AULES_BASE_URL
         self.username = username
         self.password = password
+        self.use_selenium = use_selenium
+        self.browser_pool = browser_pool
+        self.cookie_store = cookie_store
+        self.parser_backend = parser_backend
+        self.subtree_parse = subtree_parse
+        self.wait_strategy = wait_strategy
+        self.timer = PhaseTimer()
+        self.logged_in = False
+        self.include_courses = include_courses
+        self.http_cache = None
+        self.http_client = None if use_selenium else AulesHttpClient(username, password, self.base_url)
         self.driver = None
-        self.chrome_options = Options()
-        self.chrome_options.add_argument('--headless')
-        self.chrome_options.add_argument('--no-sandbox')
-        self.chrome_options.add_argument('--disable-dev-shm-usage')
-        self.chrome_options.add_argument('--disable-gpu')
-        self.chrome_options.add_argument('--window-size=1920,1080')
-        self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        self.chrome_options = None
+        self._driver_lock = threading.Lock()
+        self._holds_pool_slot = False
+        self._aborted = False
+        self.snapshots = snapshots
+        self.snapshot_ttl = snapshot_ttl
     
     def login(self):
+        if self.use_selenium:
+            self._start_driver()
+        motor = 'selenium' if self.use_selenium else 'http'
+        with self.timer.phase('login'), METRICS.timed('aules_login_segundos', motor=motor):
+            self.logged_in = self._login()
+        METRICS.inc('aules_logins_total', motor=motor, resultado='ok' if self.logged_in else 'fallo')
+        return self.logged_in
+    
+    def _login(self):
+        if self.cookie_store and self._resume_saved_session():
+            self.cookie_store.record_reused()
+            log.info("🍪 Sesión guardada reutilizada, login evitado")
+            return True
+        if not self.use_selenium:
+            logged_in = self.http_client.login()
+        else:
+            logged_in = self._login_selenium()
+        if logged_in and self.cookie_store:
+            self.cookie_store.record_full_login()
+            self._save_session()
+        return logged_in
+    
+    def _start_driver(self):
+        if self.driver:
+            return
+        if self._aborted:
+            raise RuntimeError("El crawler se ha cancelado por tiempo agotado")
+        with self.timer.phase('arranque_driver'):
+            if self.browser_pool:
+                driver = self.browser_pool.acquire()
+                with self._driver_lock:
+                    self.driver = driver
+                    self._holds_pool_slot = True
+            else:
+                from browser_pool import build_chrome_options, create_driver
+                if self.chrome_options is None:
+                    self.chrome_options = build_chrome_options(performance_logs=self.wait_strategy == 'devtools')
+                self.driver = create_driver(self.chrome_options)
+            self.driver.implicitly_wait(0)
+    
+    def _resume_saved_session(self):
+        cookie = self.cookie_store.load(self.username)
+        if not cookie:
+            return False
+        if not self.use_selenium:
+            resumed = self.http_client.resume_session(cookie)
+        else:
+            try:
+                self._start_driver()
+                self.driver.get(f"{self.base_url}/login/index.php")
+                self.driver.add_cookie({'name': 'MoodleSession', 'value': cookie['value'], 'path': cookie.get('path', '/')})
+                self.driver.get(f"{self.base_url}/my/")
+                resumed = '/login/' not in self.driver.current_url
+                if not resumed:
+                    self.driver.delete_all_cookies()
+            except Exception as e:
+                log.warning("⚠️ No se pudo reutilizar la sesión guardada: %s", e)
+                resumed = False
+        if not resumed:
+            log.info("🍪 La sesión guardada ha caducado, se hará login completo")
+            self.cookie_store.forget(self.username)
+        return resumed
+    
+    def _save_session(self):
+        if not self.use_selenium:
+            cookie = self.http_client.get_session_cookie()
+        else:
+            cookie = None
+            selenium_cookie = self.driver.get_cookie('MoodleSession')
+            if selenium_cookie:
+                cookie = {'value': selenium_cookie['value'], 'path': selenium_cookie.get('path', '/')}
+        if cookie:
+            self.cookie_store.save(self.username, cookie['value'], cookie['path'])
+    
+    def _login_selenium(self):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
         try:
-            print("🔧 Configurando ChromeDriver automáticamente...")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=self.chrome_options)
-            self.driver.implicitly_wait(10)
+            self._start_driver()
             
             login_url = f"{self.base_url}/login/index.php"
-            print(f"🌐 Navegando a: {login_url}")
+            log.info("🌐 Navegando a: %s", login_url)
             
             self.driver.get(login_url)
             WebDriverWait(self.driver, 10).until(
@@ -57,149 +153,140 @@ class AulesTimelineCrawler:
                 lambda driver: 'dashboard' in driver.current_url or 'my' in driver.current_url or 'course' in driver.current_url
             )
             
-            print("✅ Login exitoso")
+            log.info("✅ Login exitoso")
             return True
             
         except TimeoutException:
-            print("❌ Timeout durante el login")
+            log.error("❌ Timeout durante el login")
             return False
         except Exception as e:
-            print(f"💥 Error durante el login: {e}")
+            log.error("💥 Error durante el login: %s", e)
             return False
     
-    def get_timeline_page(self):
+    def get_timeline_page(self, reload=False):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException, NoSuchElementException
         timeline_url = f"{self.base_url}/my/"
         try:
-            print(f"🌐 Navegando a la cronología: {timeline_url}")
-            self.driver.get(timeline_url)
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "block_timeline"))
-            )
-            print("⏳ Esperando a que cargue el contenido dinámico de la cronología...")
-            try:
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "[data-region='event-list-content']"))
+            with self.timer.phase('carga_dashboard'):
+                if reload or self.driver.current_url.rstrip('/') != timeline_url.rstrip('/'):
+                    if self.wait_strategy == 'devtools':
+                        self._drain_performance_log()
+                    log.info("🌐 Navegando a la cronología: %s", timeline_url)
+                    self.driver.get(timeline_url)
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "block_timeline"))
                 )
-                time.sleep(3)
+            log.info("⏳ Esperando a que cargue el contenido dinámico de la cronología...")
+            try:
+                with self.timer.phase('cronologia_lista'):
+                    self._wait_for_timeline()
                 event_container = self.driver.find_element(By.CSS_SELECTOR, "[data-region='event-list-content']")
                 
                 if event_container.get_attribute('innerHTML').strip():
-                    print("✅ Contenido de la cronología cargado correctamente")
+                    log.info("✅ Contenido de la cronología cargado correctamente")
                 else:
-                    print("⚠️ El contenedor de eventos está vacío")
+                    log.warning("⚠️ El contenedor de eventos está vacío")
                 
-            except TimeoutException:
-                print("⚠️ Timeout esperando el contenido de la cronología")
+            except (TimeoutException, NoSuchElementException):
+                log.warning("⚠️ Timeout esperando el contenido de la cronología")
             html_content = self.driver.page_source
             return html_content
             
         except Exception as e:
-            print(f"💥 Error obteniendo la página de timeline: {e}")
+            log.error("💥 Error obteniendo la página de timeline: %s", e)
             return None
     
+    def _drain_performance_log(self):
+        from timeline_waits import performance_logs_available
+        if performance_logs_available(self.driver):
+            return
+        log.warning("⚠️ Los logs de rendimiento de Chrome no están disponibles, se esperará al DOM")
+        self.wait_strategy = 'dom'
+    
+    def _wait_for_timeline(self):
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import StaleElementReferenceException
+        from timeline_waits import TimelineSettled, TimelineAjaxFinished
+        if self.wait_strategy == 'devtools':
+            WebDriverWait(self.driver, TIMELINE_WAIT_TIMEOUT, poll_frequency=0.1).until(TimelineAjaxFinished())
+        WebDriverWait(self.driver, TIMELINE_WAIT_TIMEOUT, poll_frequency=0.25,
+                      ignored_exceptions=(StaleElementReferenceException,)).until(TimelineSettled())
+    
     def extract_assignments_from_timeline(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
+        from timeline_html import build_soup
+        soup = build_soup(html, self.parser_backend, self.subtree_parse)
         assignments = []
-        print("🔍 Analizando estructura de la página...")
+        log.info("🔍 Analizando estructura de la página...")
         event_container = soup.find('div', {'data-region': 'event-list-content'})
         
         if not event_container:
-            print("❌ No se encontró el contenedor de eventos de la cronología")
+            log.error("❌ No se encontró el contenedor de eventos de la cronología")
             return []
         
-        print(f"✅ Contenedor de eventos encontrado")
+        log.info("✅ Contenedor de eventos encontrado")
         event_items = event_container.find_all('div', class_='list-group-item')
-        assignment_links = event_container.find_all('a', href=re.compile(r'/mod/assign/'))
-        print(f"📋 Eventos encontrados: {len(event_items)} items, {len(assignment_links)} enlaces de tareas")
+        assignment_links = event_container.find_all('a', href=ASSIGN_HREF_RE)
+        log.info("📋 Eventos encontrados: %d items, %d enlaces de tareas", len(event_items), len(assignment_links))
         processed_ids = set()
-        for link in assignment_links:
+        for link, event_element, date_container in self._group_links_by_date(assignment_links):
             try:
-                event_element = link.find_parent('div', class_='list-group-item')
-                if not event_element:
-                    event_element = link.find_parent(['div', 'li'])
-                
-                if not event_element:
-                    continue
-                assignment_info = self.parse_assignment_element(event_element, link)
-                if assignment_info and assignment_info.get('id') not in processed_ids:
+                assignment_info = self.parse_assignment_element(event_element, link, date_container)
+                if assignment_info and assignment_info.id not in processed_ids:
                     assignments.append(assignment_info)
-                    processed_ids.add(assignment_info.get('id'))
+                    processed_ids.add(assignment_info.id)
                     
             except Exception as e:
-                print(f"⚠️ Error procesando evento: {e}")
+                METRICS.inc('aules_errores_analisis_total', fase='evento')
+                log.warning("⚠️ Error procesando evento: %s", e)
         
+        METRICS.inc('aules_entregas_analizadas_total', len(assignments), origen='html')
         return assignments
     
-    def parse_assignment_element(self, element, link=None):
+    def _group_links_by_date(self, assignment_links):
+        for link in assignment_links:
+            parents = list(link.parents)
+            element_index = None
+            for i, parent in enumerate(parents):
+                if parent.name == 'div' and 'list-group-item' in (parent.get('class') or []):
+                    element_index = i
+                    break
+            if element_index is None:
+                for i, parent in enumerate(parents):
+                    if parent.name in ('div', 'li'):
+                        element_index = i
+                        break
+            if element_index is None:
+                continue
+            date_container = None
+            for parent in parents[element_index + 1:]:
+                if parent.name == 'div' and parent.get('data-region') == 'event-list-content-date':
+                    date_container = parent
+                    break
+            yield link, parents[element_index], date_container
+    
+    def parse_assignment_element(self, element, link=None, date_container=_LOOKUP):
         try:
             if not link:
-                link = element.find('a', href=re.compile(r'/mod/assign/'))
+                link = element.find('a', href=ASSIGN_HREF_RE)
             if not link:
                 return None
-            id_match = re.search(r'id=(\d+)', link.get('href', ''))
+            id_match = ASSIGN_ID_RE.search(link.get('href', ''))
             assignment_id = id_match.group(1) if id_match else None
             assignment_name = link.get_text(strip=True)
-            meses_en = {'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
-                       'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12}
-            meses_es = {'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
-                       'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12}
-            meses = {**meses_en, **meses_es}
-            aria_label = link.get('aria-label', '')
-            fecha_entrega = None
-            hora = None
-            fecha_timestamp = None
-            fecha_pattern = r'vencerà el (\d{1,2})\s+(January|February|March|April|May|June|July|August|September|October|November|December|enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)\s+(\d{4}),\s+(\d{1,2}):(\d{2})\s+(AM|PM)'
-            fecha_match = re.search(fecha_pattern, aria_label, re.IGNORECASE)
-            if fecha_match:
-                dia = int(fecha_match.group(1))
-                mes_nombre = fecha_match.group(2).lower()
-                año = int(fecha_match.group(3))
-                hora_num = int(fecha_match.group(4))
-                minuto = fecha_match.group(5)
-                am_pm = fecha_match.group(6).upper()
-                mes_num = meses.get(mes_nombre, 1)
-                if am_pm == 'PM' and hora_num != 12:
-                    hora_num += 12
-                elif am_pm == 'AM' and hora_num == 12:
-                    hora_num = 0
-                try:
-                    fecha_timestamp = datetime(año, mes_num, dia, hora_num, int(minuto))
-                    fecha_entrega = fecha_timestamp.strftime('%d/%m/%Y')
-                    hora = fecha_timestamp.strftime('%H:%M')
-                except ValueError:
-                    pass
+            fecha_timestamp = parse_due_label(link.get('aria-label', ''))
+            METRICS.inc('aules_fecha_rama_total', rama='aria-label', resultado='ok' if fecha_timestamp else 'fallo')
+            if not fecha_timestamp:
+                if date_container is _LOOKUP:
+                    date_container = element.find_parent('div', {'data-region': 'event-list-content-date'})
+                if date_container and date_container.get('data-timestamp'):
+                    fecha_timestamp = parse_timestamp(date_container.get('data-timestamp'))
+                METRICS.inc('aules_fecha_rama_total', rama='data-timestamp', resultado='ok' if fecha_timestamp else 'fallo')
             if not fecha_timestamp:
-                timestamp_container = element.find_parent('div', {'data-region': 'event-list-content-date'})
-                if timestamp_container and timestamp_container.get('data-timestamp'):
-                    try:
-                        timestamp = int(timestamp_container.get('data-timestamp'))
-                        fecha_timestamp = datetime.fromtimestamp(timestamp)
-                        fecha_entrega = fecha_timestamp.strftime('%d/%m/%Y')
-                        hora = fecha_timestamp.strftime('%H:%M')
-                    except (ValueError, OSError):
-                        pass
-            if not fecha_entrega:
-                text = element.get_text()
-                date_pattern = r'\b(\d{1,2})\s+(?:de\s+)?(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre|january|february|march|april|may|june|july|august|september|october|november|december)(?:\s+de)?\s+(\d{4})\b'
-                time_pattern = r'\b(\d{1,2}):(\d{2})\b'
-                date_match = re.search(date_pattern, text, re.IGNORECASE)
-                time_match = re.search(time_pattern, text)
-                if date_match:
-                    dia = int(date_match.group(1))
-                    mes_nombre = date_match.group(2).lower()
-                    año = int(date_match.group(3))
-                    mes_num = meses.get(mes_nombre, 1)
-                    hora_num = 0
-                    minuto = 0
-                    if time_match:
-                        hora_num = int(time_match.group(1))
-                        minuto = int(time_match.group(2))
-                    try:
-                        fecha_timestamp = datetime(año, mes_num, dia, hora_num, minuto)
-                        fecha_entrega = fecha_timestamp.strftime('%d/%m/%Y')
-                        hora = fecha_timestamp.strftime('%H:%M')
-                    except ValueError:
-                        pass
+                fecha_timestamp = parse_date_text(element.get_text())
+                METRICS.inc('aules_fecha_rama_total', rama='texto', resultado='ok' if fecha_timestamp else 'fallo')
             curso = None
             small_text = element.find('small', class_='mb-0')
             if small_text:
@@ -207,70 +294,298 @@ class AulesTimelineCrawler:
                 if '·' in curso_text:
                     curso = curso_text.split('·')[-1].strip()
             
-            return {
-                'id': assignment_id,
-                'nombre': assignment_name,
-                'fecha_entrega': fecha_entrega or "No encontrada",
-                'hora': hora or "No encontrada",
-                'fecha_completa': fecha_timestamp.strftime('%d/%m/%Y %H:%M') if fecha_timestamp else "No encontrada",
-                'curso': curso,
-                'url': link.get('href', '') if link else ''
-            }
+            return Assignment(
+                id=assignment_id,
+                nombre=assignment_name,
+                fecha=fecha_timestamp,
+                curso=curso,
+                url=link.get('href', '') if link else ''
+            )
             
         except Exception as e:
-            print(f"⚠️ Error parseando elemento: {e}")
-            import traceback
-            traceback.print_exc()
+            METRICS.inc('aules_errores_analisis_total', fase='elemento')
+            # La traza completa solo con AULES_LOG_LEVEL=DEBUG
+            log.warning("⚠️ Error parseando elemento: %s", e, exc_info=log.isEnabledFor(logging.DEBUG))
             return None
 
     def crawl_assignments(self):
+        reused = self._reuse_snapshot()
+        if reused is not None:
+            return reused
         try:
             if not self.login():
-                print("❌ Error en el login")
+                log.error("❌ Error en el login")
                 return []
             
-            time.sleep(2)
-            
-            html = self.get_timeline_page()
+            return self._fetch_assignments()
+        finally:
+            self._release_driver()
+    
+    def poll_assignments(self):
+        if not self.logged_in and not self.login():
+            raise AulesSessionExpired("No se pudo iniciar sesión en Aules")
+        try:
+            return self._fetch_assignments(reload=True)
+        except AulesSessionExpired:
+            log.info("🔑 La sesión de Aules ha caducado, repitiendo login...")
+            self.logged_in = False
+            if self.cookie_store:
+                self.cookie_store.forget(self.username)
+            if not self.login():
+                raise
+            return self._fetch_assignments(reload=True)
+    
+    def _reuse_snapshot(self):
+        # Las instantáneas solo guardan la cronología: con --cursos hay que volver a consultar Aules
+        if not self.snapshots or not self.snapshot_ttl or self.include_courses:
+            return None
+        snapshot = self.snapshots.latest(self.username, max_age=self.snapshot_ttl * 60)
+        if not snapshot:
+            return None
+        minutes = (time.time() - snapshot['fetched_at']) / 60
+        log.info("📦 Reutilizando la instantánea #%s de hace %.0f min, sin conectar con Aules", snapshot['id'], minutes)
+        return snapshot['assignments']
+    
+    def _record_snapshot(self, kind, content, assignments):
+        if not self.snapshots:
+            return
+        try:
+            with self.timer.phase('instantanea'):
+                snapshot_id = self.snapshots.store(self.username, kind, content, assignments)
+            log.info("📦 Instantánea #%s guardada", snapshot_id)
+        except Exception as e:
+            log.warning("⚠️ No se pudo guardar la instantánea: %s", e)
+    
+    def _fetch_assignments(self, reload=False):
+        if not self.use_selenium:
+            with self.timer.phase('cronologia_lista'):
+                events = self.http_client.get_timeline_events()
+                assignments = assignments_from_events(events)
+            self._record_snapshot('ajax', json.dumps(events, ensure_ascii=False), assignments)
+        else:
+            html = self.get_timeline_page(reload)
+            if self.driver and '/login/' in self.driver.current_url:
+                raise AulesSessionExpired("Aules ha redirigido a la página de login")
             if not html:
-                print("❌ No se pudo cargar la página")
+                log.error("❌ No se pudo cargar la página")
                 return []
             
-            assignments = self.extract_assignments_from_timeline(html)
-            return assignments
+            with self.timer.phase('analisis'):
+                assignments = self.extract_assignments_from_timeline(html)
+            self._record_snapshot('html', html, assignments)
+        
+        if self.include_courses:
+            with self.timer.phase('detalle_cursos'):
+                assignments = self._add_course_details(assignments)
+        return assignments
+    
+    def _course_http_client(self):
+        if not self.use_selenium:
+            return self.http_client
+        client = AulesHttpClient(self.username, self.password, self.base_url)
+        for cookie in self.driver.get_cookies():
+            client.session.cookies.set(cookie['name'], cookie['value'], path=cookie.get('path', '/'))
+        client.sesskey = client._find_sesskey(self.driver.page_source)
+        return client
+    
+    def _add_course_details(self, assignments):
+        from course_crawler import CourseAssignmentCrawler, merge_course_assignments
+        from http_cache import HttpCache
+        if self.http_cache is None:
+            self.http_cache = HttpCache()
+        client = self._course_http_client()
+        try:
+            course_entries = CourseAssignmentCrawler(client, self.http_cache).crawl()
         finally:
-            if self.driver:
-                self.driver.quit()
-                print("🔒 Driver de Selenium cerrado")
+            if client is not self.http_client:
+                client.close()
+        return merge_course_assignments(assignments, course_entries)
+    
+    def _release_driver(self):
+        # close() puede llegar a la vez desde el hilo del worker y desde el que vigila los tiempos
+        with self._driver_lock:
+            driver, self.driver = self.driver, None
+            holds_slot, self._holds_pool_slot = self._holds_pool_slot, False
+            self.logged_in = False
+        if self.browser_pool and holds_slot:
+            if driver and not self._aborted:
+                self.browser_pool.release(driver)
+                log.info("♻️ Driver de Selenium devuelto al pool")
+            else:
+                if driver:
+                    self.browser_pool.discard(driver)
+                self.browser_pool.release_slot()
+        elif driver:
+            driver.quit()
+            log.info("🔒 Driver de Selenium cerrado")
+    
+    def abort(self):
+        # Se llama desde otro hilo cuando el worker se ha pasado de tiempo y puede seguir usando el navegador:
+        # el navegador se cierra y sale del pool, pero su hueco no se libera hasta que el worker termine
+        with self._driver_lock:
+            self._aborted = True
+            driver, self.driver = self.driver, None
+            self.logged_in = False
+        if driver:
+            if self.browser_pool:
+                self.browser_pool.discard(driver)
+            else:
+                driver.quit()
+        if self.http_client:
+            self.http_client.close()
     
     def close(self):
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        self._release_driver()
+        if self.http_cache:
+            self.http_cache.close()
+            self.http_cache = None
+        if self.http_client:
+            self.http_client.close()
+        if self.snapshots:
+            self.snapshots.close()
+            self.snapshots = None
 
-def main():
-    USERNAME = os.getenv("AULES_USERNAME")
-    PASSWORD = os.getenv("AULES_PASSWORD")
-    
-    if not USERNAME or not PASSWORD:
-        print("❌ Error: Las variables AULES_USERNAME y AULES_PASSWORD deben estar definidas en el archivo .env")
-        print("💡 Copia el archivo .env.example a .env y completa tus credenciales")
+def parse_args(argv=None):
+    from cli import add_sync_arguments
+    parser = argparse.ArgumentParser(description="Extrae las entregas de Aules y las sincroniza con Google Calendar")
+    add_sync_arguments(parser)
+    return parser.parse_args(argv)
+
+def parse_snapshot(kind, content, parser_backend=HTML_PARSER_BACKEND):
+    if kind == 'ajax':
+        return assignments_from_events(json.loads(content))
+    crawler = AulesTimelineCrawler('', '', use_selenium=True, parser_backend=parser_backend)
+    return crawler.extract_assignments_from_timeline(content)
+
+def build_crawler(args, username, password):
+    from snapshot_cache import SnapshotCache
+    snapshots = None if args.sin_instantaneas else SnapshotCache()
+    return AulesTimelineCrawler(username, password, cookie_store=CookieStore(), include_courses=args.cursos,
+                                snapshots=snapshots, snapshot_ttl=args.reutilizar)
+
+def aules_credentials():
+    username = os.getenv("AULES_USERNAME")
+    password = os.getenv("AULES_PASSWORD")
+    if not username or not password:
+        log.error("❌ Error: Las variables AULES_USERNAME y AULES_PASSWORD deben estar definidas en el archivo .env")
+        log.error("💡 Copia el archivo .env.example a .env y completa tus credenciales")
+        return None
+    return username, password
+
+def run_watch(crawler, delete_removed=False):
+    from calendar_manager import CalendarManager
+    from watcher import AssignmentWatcher
+    print("\n🔐 Conectando con Google Calendar...")
+    calendar = CalendarManager()
+    if not calendar.service:
+        print("\n❌ No se pudo conectar con Google Calendar")
+        crawler.close()
+        return
+    AssignmentWatcher(crawler, calendar, SyncState(), delete_removed=delete_removed).run()
+
+def run_async_pipeline(crawler, delete_removed=False, confirm=True):
+    from calendar_manager import CalendarManager
+    from async_pipeline import run_pipeline
+    if confirm:
+        answer = input("\n📅 ¿Sincronizar las entregas con Google Calendar a medida que se descargan? (s/n): ")
+        if answer.strip().lower() != 's':
+            print("\n📋 Operación cancelada. Las entregas no se agregaron al calendario.")
+            return
+    print("\n🔐 Conectando con Google Calendar...")
+    calendar = CalendarManager()
+    if not calendar.service:
+        print("\n❌ No se pudo conectar con Google Calendar")
+        return
+    state = SyncState()
+    try:
+        summary = run_pipeline(crawler, calendar, state, delete_removed)
+    finally:
+        state.close()
+    print(f"\n✅ {summary['creados']} eventos creados, {summary['actualizados']} actualizados, "
+          f"{summary['eliminados']} eliminados y {summary['sin_cambios']} sin cambios")
+
+def print_assignments(assignments):
+    print(f"\n🎯 ENCONTRADAS {len(assignments)} ENTREGAS:")
+    # En modo silencioso no se formatea ninguna línea por entrega
+    if not log.isEnabledFor(logging.INFO):
+        return
+    for i, assignment in enumerate(assignments, 1):
+        log.info("   %d. 📝 %s - 📅 %s", i, assignment.nombre, assignment.fecha_completa)
+
+def setup_observability(args):
+    from logs import setup_logging
+    # Con crawl --json, stdout queda reservado para las entregas y los mensajes van a stderr
+    stream = sys.stderr if getattr(args, 'json', False) else None
+    setup_logging(quiet=args.quiet, json_format=args.log_json, stream=stream)
+    if args.metricas_puerto:
+        METRICS.serve(args.metricas_puerto)
+
+def run_crawl(args):
+    setup_observability(args)
+    credentials = aules_credentials()
+    if not credentials:
         return
+    crawler = build_crawler(args, *credentials)
+    try:
+        assignments = crawler.crawl_assignments()
+        if args.json:
+            print(json.dumps([a.to_dict() for a in assignments], ensure_ascii=False, indent=2,
+                             default=lambda value: value.isoformat()))
+            return
+        print_assignments(assignments)
+    finally:
+        crawler.close()
+        extra = sys.stderr if args.json else None
+        if args.tiempos:
+            emit_timings(crawler.timer, args.tiempos, extra)
+        if args.metricas:
+            METRICS.write(args.metricas, extra)
+
+def main(argv=None):
+    run_sync(parse_args(argv))
+
+def run_sync(args):
+    from calendar_manager import CalendarManager
+    setup_observability(args)
+    credentials = aules_credentials()
+    if not credentials:
+        return
+    
+    crawler = build_crawler(args, *credentials)
     
-    crawler = AulesTimelineCrawler(USERNAME, PASSWORD)
+    if args.watch:
+        try:
+            run_watch(crawler, args.borrar_eliminadas)
+        finally:
+            if args.metricas:
+                METRICS.write(args.metricas)
+        return
     
     print("🚀 Extrayendo entregas de Aules y agregándolas a Google Calendar...")
     
     try:
+        if args.pipeline and not args.dry_run:
+            run_async_pipeline(crawler, args.borrar_eliminadas, confirm=not args.yes)
+            return
+        
         assignments = crawler.crawl_assignments()
         
         if assignments:
-            print(f"\n🎯 ENCONTRADAS {len(assignments)} ENTREGAS:")
-            for i, assignment in enumerate(assignments, 1):
-                print(f"   {i}. 📝 {assignment['nombre']} - 📅 {assignment['fecha_completa']}")
+            print_assignments(assignments)
             
             print("\n" + "="*60)
-            add_to_calendar = input("\n📅 ¿Agregar estas entregas a Google Calendar? (s/n): ").strip().lower()
+            if args.dry_run:
+                state = SyncState()
+                try:
+                    compute_plan(assignments, state.get_all(), args.borrar_eliminadas, state.due_dates()).log_plan()
+                finally:
+                    state.close()
+                print("\n📋 Modo simulación: no se ha modificado el calendario.")
+                return
+            if args.yes:
+                add_to_calendar = 's'
+            else:
+                add_to_calendar = input("\n📅 ¿Sincronizar estas entregas con Google Calendar? (s/n): ").strip().lower()
             
             if add_to_calendar == 's':
                 try:
@@ -278,12 +593,19 @@ def main():
                     calendar = CalendarManager()
                     
                     if calendar.service:
-                        print(f"\n⏳ Creando {len(assignments)} eventos en el calendario...")
-                        created_events = calendar.create_events_from_assignments(assignments)
+                        print(f"\n⏳ Sincronizando {len(assignments)} entregas con el calendario...")
+                        state = SyncState()
+                        try:
+                            with crawler.timer.phase('sincronizacion_calendario'):
+                                summary = calendar.sync_assignments(assignments, state, delete_removed=args.borrar_eliminadas)
+                        finally:
+                            state.close()
                         
-                        if created_events:
-                            print(f"\n✅ ¡Éxito! Se crearon {len(created_events)} eventos en tu calendario de Google")
+                        if summary['creados'] or summary['actualizados'] or summary['eliminados']:
+                            print(f"\n✅ ¡Éxito! {summary['creados']} eventos creados, {summary['actualizados']} actualizados y {summary['eliminados']} eliminados")
                             print(f"📅 Puedes verlos en: https://calendar.google.com/")
+                        elif summary['sin_cambios']:
+                            print(f"\n✅ El calendario ya estaba al día ({summary['sin_cambios']} entregas sin cambios)")
                         else:
                             print("\n⚠️ No se pudieron crear los eventos. Verifica las fechas y vuelve a intentar.")
                     else:
@@ -300,6 +622,18 @@ def main():
         print(f"💥 Error durante la ejecución: {e}")
     finally:
         crawler.close()
+        if args.tiempos:
+            emit_timings(crawler.timer, args.tiempos)
+        if args.metricas:
+            METRICS.write(args.metricas)
+
+def emit_timings(timer, destination, stream=None):
+    if destination == '-':
+        print(timer.to_json(), file=stream)
+    else:
+        with open(destination, 'w', encoding='utf-8') as f:
+            f.write(timer.to_json())
+        log.info("⏱️ Tiempos guardados en %s", destination)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()